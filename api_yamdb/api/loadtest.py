@@ -0,0 +1,253 @@
+import json
+import re
+import time
+from collections import namedtuple
+from http import HTTPStatus
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import quote, urlsplit
+
+VARIABLE_PATTERN = re.compile(r'{{\s*(\w+)\s*}}')
+# Ожидаемый статус и сохранение переменных записаны в тестах запросов
+# коллекции; скрипты однотипны, поэтому их достаточно разобрать
+# регулярными выражениями вместо исполнения JavaScript.
+EXPECTED_STATUS_PATTERN = re.compile(
+    r'pm\.response\.status,.*?\.to\.be\.eql\(\s*["\']([^"\']+)["\']\s*\)',
+    re.S
+)
+EXTRACT_PATTERN = re.compile(
+    r'const (\w+) = _\.get\(responseData, ["\'](\w+)["\']\)'
+)
+SET_PATTERN = re.compile(
+    r'pm\.collectionVariables\.set\(["\'](\w+)["\'], (\w+)\)'
+)
+STATUS_BY_PHRASE = {status.phrase: status.value for status in HTTPStatus}
+
+# Уникальные поля, которые получают метку виртуального пользователя.
+NAMESPACED_FIELDS = ('username', 'email', 'slug')
+# Учётные записи коллекции: переменные <account>Username, <account>Email
+# и <account>ConfirmationCode.
+ACCOUNTS = ('user', 'superuser', 'admin', 'moderator')
+CODE_SUFFIX = 'ConfirmationCode'
+TAG_VARIABLE = 'loadTag'
+# Перцентили задержки в отчётах load_test и benchmark.
+PERCENTILES = (50, 95, 99)
+
+Step = namedtuple(
+    'Step',
+    ('name', 'method', 'url', 'body', 'token', 'expected', 'captures')
+)
+Sample = namedtuple('Sample', ('step', 'status', 'elapsed', 'ok'))
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[index]
+
+
+def namespace(value):
+    """Добавляет к значению метку, для email — к имени ящика."""
+    tag = '{{%s}}' % TAG_VARIABLE
+    local, at, domain = value.rpartition('@')
+    if at:
+        return f'{local}-{tag}@{domain}'
+    return f'{value}-{tag}'
+
+
+def with_tag(value, tag):
+    """Подставляет в значение метку прохода."""
+    return value.replace('{{%s}}' % TAG_VARIABLE, tag)
+
+
+def step_script(item):
+    return '\n'.join(
+        line
+        for event in item.get('event', ())
+        if event['listen'] == 'test'
+        for line in event['script']['exec']
+    )
+
+
+def parse_step(name, item, auth):
+    """
+    Шаг из запроса коллекции.
+
+    В шагах, которые должны выполниться успешно, литеральные username,
+    email и slug тела получают метку виртуального пользователя, иначе
+    параллельные пользователи и повторы конфликтовали бы. Запросы,
+    которые должны вернуть ошибку, отправляются как есть.
+    """
+    request = item['request']
+    script = step_script(item)
+    match = EXPECTED_STATUS_PATTERN.search(script)
+    expected = STATUS_BY_PHRASE[match[1]] if match else None
+    body = (request.get('body') or {}).get('raw') or None
+    if body and expected and expected < HTTPStatus.BAD_REQUEST:
+        data = json.loads(body)
+        for field in NAMESPACED_FIELDS:
+            value = data.get(field)
+            if isinstance(value, str) and value and '{{' not in value:
+                data[field] = namespace(value)
+        body = json.dumps(data, ensure_ascii=False)
+    auth = request.get('auth', auth) or {}
+    token = None
+    if auth.get('type') == 'bearer':
+        token = next(
+            entry['value'] for entry in auth['bearer']
+            if entry['key'] == 'token'
+        )
+    fields = dict(EXTRACT_PATTERN.findall(script))
+    captures = tuple(
+        (variable, fields[value])
+        for variable, value in SET_PATTERN.findall(script)
+        if value in fields
+    )
+    return Step(
+        name, request['method'], request['url']['raw'], body, token,
+        expected, captures
+    )
+
+
+def collect_steps(items, path, auth, steps):
+    for item in items:
+        name = f'{path} / {item["name"]}' if path else item['name']
+        if 'item' in item:
+            collect_steps(
+                item['item'], name, item.get('auth', auth), steps
+            )
+            continue
+        key, number = name, 1
+        while key in steps:
+            number += 1
+            key = f'{name} #{number}'
+        steps[key] = parse_step(key, item, auth)
+
+
+def load_collection(path, folders=None):
+    """
+    Читает Postman-коллекцию (схема v2.1).
+
+    Возвращает шаги в порядке коллекции и начальные значения
+    переменных. folders — названия папок верхнего уровня или их начала
+    (например, registration); папки идут в порядке коллекции.
+    """
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+    items = collection['item']
+    if folders:
+        unknown = [
+            folder for folder in folders
+            if not any(item['name'].startswith(folder) for item in items)
+        ]
+        if unknown:
+            raise ValueError(f'В коллекции нет папок: {unknown}')
+        items = [
+            item for item in items
+            if any(item['name'].startswith(folder) for folder in folders)
+        ]
+    steps = {}
+    collect_steps(items, '', collection.get('auth'), steps)
+    variables = {
+        variable['key']: variable['value']
+        for variable in collection.get('variable', ())
+        # Коды подтверждения в коллекции — заглушки для ручного ввода.
+        if not variable['key'].endswith(CODE_SUFFIX)
+    }
+    for account in ACCOUNTS:
+        for suffix in ('Username', 'Email'):
+            key = f'{account}{suffix}'
+            if key in variables:
+                variables[key] = namespace(variables[key])
+    return list(steps.values()), variables
+
+
+class VirtualUser:
+    """
+    Виртуальный пользователь: проходит шаги коллекции по порядку.
+
+    У каждого прохода свои переменные: значения по умолчанию с меткой
+    прохода, токены и id из ответов предыдущих шагов. Код подтверждения
+    <account>ConfirmationCode запрашивается у confirmation_code по
+    имени пользователя <account>Username — в коллекции его копируют
+    из письма вручную.
+
+    Каждый запрос идёт в новом соединении (Connection: close): при
+    keep-alive ответы runserver приходят с задержкой отложенного ACK
+    около 40 мс, и замер показывал бы её вместо времени ответа.
+    """
+
+    def __init__(self, steps, variables, base_url, confirmation_code=None,
+                 timeout=30):
+        parts = urlsplit(base_url)
+        connection_class = (
+            HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+        )
+        self.connection = connection_class(
+            parts.hostname, parts.port, timeout=timeout
+        )
+        self.path_prefix = parts.path.rstrip('/')
+        self.steps = steps
+        self.defaults = variables
+        self.confirmation_code = confirmation_code
+
+    def run(self, tag):
+        self.variables = {**self.defaults, TAG_VARIABLE: tag}
+        return [self.request(step) for step in self.steps]
+
+    def value(self, name):
+        if name.endswith(CODE_SUFFIX) and self.confirmation_code:
+            username = self.variables.get(
+                f'{name[:-len(CODE_SUFFIX)]}Username'
+            )
+            if username:
+                return self.confirmation_code(self.render(username))
+        if name in self.variables:
+            return self.render(str(self.variables[name]))
+        return '{{%s}}' % name
+
+    def render(self, template):
+        return VARIABLE_PATTERN.sub(
+            lambda match: self.value(match[1]), template
+        )
+
+    def request(self, step):
+        url = urlsplit(self.render(step.url))
+        path = quote(self.path_prefix + url.path, safe='/%')
+        if url.query:
+            path += '?' + quote(url.query, safe='=&%')
+        headers = {'Accept': 'application/json', 'Connection': 'close'}
+        if step.token:
+            headers['Authorization'] = f'Bearer {self.render(step.token)}'
+        body = None
+        if step.body is not None:
+            body = self.render(step.body).encode()
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        try:
+            self.connection.request(step.method, path, body, headers)
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, HTTPException):
+            return Sample(
+                step.name, None, time.perf_counter() - started, False
+            )
+        finally:
+            self.connection.close()
+        elapsed = time.perf_counter() - started
+        ok = step.expected is None or response.status == step.expected
+        # Как в коллекции: переменные сохраняются, только если статус
+        # совпал с ожидаемым.
+        if ok and step.captures:
+            self.capture(step, content)
+        return Sample(step.name, response.status, elapsed, ok)
+
+    def capture(self, step, content):
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        for variable, field in step.captures:
+            if data.get(field):
+                self.variables[variable] = data[field]
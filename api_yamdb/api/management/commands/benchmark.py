@@ -0,0 +1,366 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test.utils import override_settings
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.loadtest import PERCENTILES, percentile
+from api.middleware import QueryRecorder
+from api.v1 import urls
+from api.v1.authentication import RoleAccessToken, set_role_version
+from api.v1.services import ConfirmationCodeService
+from reviews.models import (
+    Category, Comment, Genre, ImportJob, Review, Title, User
+)
+from reviews.synthetic import (
+    DEFAULT_BATCH_SIZE, SyntheticDataGenerator, SyntheticScale
+)
+
+SAMPLE_SIZE = 100
+
+
+def route_patterns(patterns):
+    """Маршруты по имени; первым идёт шаблон без суффикса формата."""
+    routes = {}
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            for name, route in route_patterns(pattern.url_patterns).items():
+                routes.setdefault(name, route)
+        else:
+            routes.setdefault(pattern.name, str(pattern.pattern))
+    return routes
+
+
+def sample_rows(queryset, fields, size, rng):
+    """
+    Случайные строки таблицы без ORDER BY RANDOM().
+
+    Каждая строка — первая с pk не меньше случайного числа из диапазона
+    id; на больших таблицах это запросы по первичному ключу.
+    """
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return []
+    return [
+        queryset.filter(pk__gte=rng.randint(bounds['low'], bounds['high']))
+        .order_by('pk').values_list(*fields).first()
+        for _ in range(size)
+    ]
+
+
+def summarize(method, route, latencies, queries, statuses):
+    latencies = sorted(latencies)
+    result = {
+        'method': method.upper(), 'route': route, 'requests': len(latencies)
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(
+            percentile(latencies, percent) * 1000, 3
+        )
+    result['mean_ms'] = round(statistics.fmean(latencies) * 1000, 3)
+    result['queries_mean'] = round(statistics.fmean(queries), 2)
+    result['queries_max'] = max(queries)
+    result['statuses'] = {
+        str(code): count for code, count in sorted(statuses.items())
+    }
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50, p95, p99) и число запросов к БД '
+        'для каждого маршрута api/v1 и пишет результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--generate',
+            action='store_true',
+            help='Перед замером заполнить базу синтетическими данными'
+        )
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=10000)
+        parser.add_argument('--reviews', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество записей в одном bulk_create при генерации'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество замеряемых запросов к каждому маршруту'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help='Количество незамеряемых запросов перед замером'
+        )
+        parser.add_argument(
+            '--route',
+            action='append',
+            dest='routes',
+            help='Замерить только этот маршрут (можно несколько раз)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Зерно генератора случайных чисел'
+        )
+        parser.add_argument(
+            '--label',
+            default='',
+            help='Метка прогона, например ветка или коммит'
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='JSON-файл с результатами'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON предыдущего прогона для сравнения p95'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        if options['generate']:
+            self.generate(options)
+
+        routes = route_patterns(urls.urlpatterns)
+        selected = options['routes'] or list(routes)
+        unknown = set(selected) - set(routes)
+        if unknown:
+            raise CommandError(f'Неизвестные маршруты: {sorted(unknown)}')
+
+        # Все записи прогона (служебный администратор, удаления и
+        # регистрации) откатываются, база остаётся прежней. Ограничения
+        # частоты отключены: сотни регистраций и удалений подряд иначе
+        # замерили бы ответы 429.
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend',
+            REST_FRAMEWORK={
+                **settings.REST_FRAMEWORK,
+                'DEFAULT_THROTTLE_RATES': dict.fromkeys(
+                    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+                )
+            }
+        ), transaction.atomic():
+            scenarios = self.scenarios()
+            missing = set(routes) - set(scenarios)
+            if missing:
+                raise CommandError(
+                    f'Нет сценария замера для маршрутов: {sorted(missing)}'
+                )
+            results = {}
+            for name in selected:
+                results[name] = self.measure(
+                    routes[name], scenarios[name], options
+                )
+                self.stdout.write(self.format_result(name, results[name]))
+            transaction.set_rollback(True)
+
+        report = {
+            'label': options['label'],
+            'created': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {
+                model._meta.model_name: model.objects.count()
+                for model in (User, Category, Genre, Title, Review, Comment)
+            },
+            'requests': options['requests'],
+            'routes': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {options["output"]}'
+        ))
+        if options['compare']:
+            self.compare(options['compare'], results)
+
+    def generate(self, options):
+        scale = SyntheticScale(*(
+            options[name] for name in SyntheticScale._fields
+        ))
+
+        def progress(label, count):
+            self.stdout.write(f'  создано {label}: {count}')
+
+        started = time.perf_counter()
+        SyntheticDataGenerator(
+            scale, batch_size=options['batch_size'], seed=options['seed'],
+            progress=progress
+        ).generate()
+        self.stdout.write(
+            f'Данные сгенерированы за {time.perf_counter() - started:.1f} с'
+        )
+
+    def scenarios(self):
+        """
+        Запрос к каждому маршруту: функция от номера итерации,
+        возвращающая метод, URL и данные.
+
+        Объекты берутся из случайной выборки существующих записей.
+        """
+        rng = self.rng
+        titles = sample_rows(Title.objects, ('pk',), SAMPLE_SIZE, rng)
+        reviews = sample_rows(
+            Review.objects, ('pk', 'title_id'), SAMPLE_SIZE, rng
+        )
+        comments = sample_rows(
+            Comment.objects, ('pk', 'review_id', 'review__title_id'),
+            SAMPLE_SIZE, rng
+        )
+        users = sample_rows(User.objects, ('username',), SAMPLE_SIZE, rng)
+        if not (titles and reviews and comments):
+            raise CommandError(
+                'В базе нет произведений, отзывов или комментариев: '
+                'запустите команду с --generate.'
+            )
+
+        admin = User.objects.create_user(
+            username='benchmark_admin', email='benchmark_admin@yamdb.fake',
+            role=User.RoleChoises.ADMIN
+        )
+        set_role_version(admin.pk, admin.role_version)
+        self.admin = admin
+        # Ошибки 500 учитываются в статусах, а не прерывают замер.
+        self.client = APIClient(raise_request_exception=False)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(admin)}'
+        )
+        genre = Genre.objects.create(name='Замер', slug='benchmark-genre')
+        category = Category.objects.create(
+            name='Замер', slug='benchmark-category'
+        )
+        job = ImportJob.objects.create(
+            entity=ImportJob.EntityChoices.GENRE, file_path='',
+            created_by=admin
+        )
+        code = ConfirmationCodeService.generate_code(admin)
+
+        def get(name, **kwargs):
+            return 'get', reverse(f'api:v1:{name}', kwargs=kwargs), None
+
+        def review_kwargs():
+            pk, title_id = rng.choice(reviews)
+            return {'title_id': title_id, 'pk': pk}
+
+        def comment_kwargs():
+            pk, review_id, title_id = rng.choice(comments)
+            return {'title_id': title_id, 'review_id': review_id, 'pk': pk}
+
+        def comment_list_kwargs():
+            kwargs = comment_kwargs()
+            del kwargs['pk']
+            return kwargs
+
+        return {
+            'api-root': lambda i: get('api-root'),
+            'signup': lambda i: ('post', reverse('api:v1:signup'), {
+                'username': f'benchmark_{i}',
+                'email': f'benchmark_{i}@yamdb.fake'
+            }),
+            'token': lambda i: ('post', reverse('api:v1:token'), {
+                'username': admin.username, 'confirmation_code': code
+            }),
+            'user-list': lambda i: get('user-list'),
+            'user-me': lambda i: get('user-me'),
+            'user-detail': lambda i: get(
+                'user-detail', username=rng.choice(users)[0]
+            ),
+            'title-list': lambda i: get('title-list'),
+            'title-detail': lambda i: get(
+                'title-detail', pk=rng.choice(titles)[0]
+            ),
+            'genre-list': lambda i: get('genre-list'),
+            'genre-detail': lambda i: (
+                'delete',
+                reverse('api:v1:genre-detail', kwargs={'slug': genre.slug}),
+                None
+            ),
+            'category-list': lambda i: get('category-list'),
+            'category-detail': lambda i: (
+                'delete',
+                reverse(
+                    'api:v1:category-detail', kwargs={'slug': category.slug}
+                ),
+                None
+            ),
+            'import-list': lambda i: get('import-list'),
+            'import-detail': lambda i: get('import-detail', pk=job.pk),
+            'review-list': lambda i: get(
+                'review-list', title_id=rng.choice(reviews)[1]
+            ),
+            'review-detail': lambda i: get('review-detail', **review_kwargs()),
+            'comment-list': lambda i: get(
+                'comment-list', **comment_list_kwargs()
+            ),
+            'comment-detail': lambda i: get(
+                'comment-detail', **comment_kwargs()
+            ),
+        }
+
+    def request(self, method, url, data):
+        """Выполняет запрос; записи откатываются к точке сохранения."""
+        recorder = QueryRecorder()
+        with transaction.atomic():
+            with connection.execute_wrapper(recorder):
+                started = time.perf_counter()
+                response = getattr(self.client, method)(url, data=data)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        return response.status_code, elapsed, recorder.count
+
+    def measure(self, route, scenario, options):
+        for i in range(options['warmup']):
+            self.request(*scenario(-i - 1))
+        latencies, queries, statuses = [], [], Counter()
+        for i in range(options['requests']):
+            method, url, data = scenario(i)
+            status, elapsed, count = self.request(method, url, data)
+            latencies.append(elapsed)
+            queries.append(count)
+            statuses[status] += 1
+        return summarize(method, route, latencies, queries, statuses)
+
+    def format_result(self, name, result):
+        return (
+            f'{name:<16} {result["method"]:<6} '
+            f'p50 {result["p50_ms"]:>8.2f} мс  '
+            f'p95 {result["p95_ms"]:>8.2f} мс  '
+            f'p99 {result["p99_ms"]:>8.2f} мс  '
+            f'запросов {result["queries_mean"]:>5.1f}  '
+            f'статусы {result["statuses"]}'
+        )
+
+    def compare(self, path, results):
+        with open(path, encoding='utf-8') as f:
+            baseline = json.load(f)['routes']
+        self.stdout.write(f'Сравнение p95 с {path}:')
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            before = baseline[name]['p95_ms']
+            after = result['p95_ms']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f'{name:<16} {before:>8.2f} -> {after:>8.2f} мс '
+                f'({change:+.1f}%)'
+            )
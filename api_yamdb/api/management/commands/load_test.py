@@ -0,0 +1,217 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.loadtest import (
+    PERCENTILES, VirtualUser, load_collection, percentile, with_tag
+)
+from api.v1.services import ConfirmationCodeService
+from reviews.models import User
+
+DEFAULT_COLLECTION = (
+    settings.BASE_DIR.parent / 'postman_collection'
+    / 'Ymdb-collection.postman_collection.json'
+)
+# Пользователи, которых коллекция ожидает в базе (см. set_up_data.sh).
+FIXTURE_USERS = {
+    'superuser': {'is_superuser': True, 'is_staff': True},
+    'admin': {'role': User.RoleChoises.ADMIN},
+    'moderator': {'role': User.RoleChoises.MODERATOR},
+}
+
+
+def confirmation_code(username):
+    """Код подтверждения, который сервер отправил бы письмом."""
+    try:
+        user = User.objects.get(username=username)
+    except User.DoesNotExist:
+        return ''
+    finally:
+        # Запросы идут из потоков виртуальных пользователей.
+        connection.close()
+    return ConfirmationCodeService.generate_code(user)
+
+
+def summarize(samples, duration):
+    """Сводка по шагу: пропускная способность, ошибки и задержки."""
+    latencies = sorted(sample.elapsed for sample in samples)
+    errors = sum(not sample.ok for sample in samples)
+    result = {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / duration, 2),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4),
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(
+            percentile(latencies, percent) * 1000, 3
+        )
+    result['mean_ms'] = round(statistics.fmean(latencies) * 1000, 3)
+    statuses = {}
+    for sample in samples:
+        code = str(sample.status or 'error')
+        statuses[code] = statuses.get(code, 0) + 1
+    result['statuses'] = dict(sorted(statuses.items()))
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон Postman-коллекции: виртуальные пользователи '
+        'параллельно проходят её запросы на запущенном сервере'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='Адрес сервера вместо адреса из коллекции'
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10,
+            help='Количество параллельных виртуальных пользователей'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=1,
+            help='Сколько раз каждый пользователь проходит коллекцию'
+        )
+        parser.add_argument(
+            '--folder',
+            action='append',
+            dest='folders',
+            help=(
+                'Пройти только папку верхнего уровня (можно несколько раз); '
+                'токены выдаёт папка registration'
+            )
+        )
+        parser.add_argument(
+            '--collection',
+            default=str(DEFAULT_COLLECTION),
+            help='Файл Postman-коллекции'
+        )
+        parser.add_argument(
+            '--prefix',
+            help='Метка прогона в именах пользователей и slug'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Таймаут запроса в секундах'
+        )
+        parser.add_argument(
+            '--output',
+            default='load_test.json',
+            help='JSON-файл с результатами'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['iterations'] < 1:
+            raise CommandError(
+                'Число пользователей и проходов должно быть положительным.'
+            )
+        try:
+            steps, variables = load_collection(
+                options['collection'], options['folders']
+            )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        prefix = options['prefix'] or uuid4().hex[:6]
+        tags = [
+            [f'{prefix}-{user}-{iteration}'
+             for iteration in range(options['iterations'])]
+            for user in range(options['users'])
+        ]
+        self.create_fixture_users(
+            variables, [tag for user_tags in tags for tag in user_tags]
+        )
+        virtual_users = [
+            VirtualUser(
+                steps, variables, options['base_url'], confirmation_code,
+                timeout=options['timeout']
+            )
+            for _ in tags
+        ]
+        self.stdout.write(
+            f'Шагов в коллекции: {len(steps)}, пользователей: '
+            f'{len(tags)}, проходов: {options["iterations"]}'
+        )
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(tags)) as executor:
+            runs = list(executor.map(self.run_user, virtual_users, tags))
+        duration = time.perf_counter() - started
+
+        by_step = {step.name: [] for step in steps}
+        for samples in runs:
+            for sample in samples:
+                by_step[sample.step].append(sample)
+        results = {
+            name: {'method': step.method, 'expected': step.expected,
+                   **summarize(by_step[name], duration)}
+            for name, step in zip(by_step, steps)
+        }
+        total = sum(result['requests'] for result in results.values())
+        errors = sum(result['errors'] for result in results.values())
+        for name, result in results.items():
+            self.stdout.write(self.format_result(name, result))
+
+        report = {
+            'prefix': prefix,
+            'created': timezone.now().isoformat(),
+            'base_url': options['base_url'],
+            'users': options['users'],
+            'iterations': options['iterations'],
+            'duration_s': round(duration, 3),
+            'requests': total,
+            'throughput_rps': round(total / duration, 2),
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'steps': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        style = self.style.SUCCESS if not errors else self.style.WARNING
+        self.stdout.write(style(
+            f'Запросов: {total} за {duration:.1f} с '
+            f'({report["throughput_rps"]:.1f} в секунду), '
+            f'ошибок: {errors} ({report["error_rate"]:.1%}). '
+            f'Результаты записаны в {options["output"]}'
+        ))
+
+    def create_fixture_users(self, variables, tags):
+        """Создаёт пользователей из set_up_data.sh для каждого прохода."""
+        for tag in tags:
+            for account, fields in FIXTURE_USERS.items():
+                user = User(
+                    username=with_tag(variables[f'{account}Username'], tag),
+                    email=with_tag(variables[f'{account}Email'], tag),
+                    **fields
+                )
+                user.set_unusable_password()
+                user.save()
+
+    @staticmethod
+    def run_user(virtual_user, tags):
+        return [sample for tag in tags for sample in virtual_user.run(tag)]
+
+    def format_result(self, name, result):
+        return (
+            f'{result["method"]:<6} {result["requests"]:>5}  '
+            f'ошибок {result["error_rate"]:>6.1%}  '
+            f'p50 {result["p50_ms"]:>8.2f} мс  '
+            f'p95 {result["p95_ms"]:>8.2f} мс  '
+            f'p99 {result["p99_ms"]:>8.2f} мс  {name}'
+        )
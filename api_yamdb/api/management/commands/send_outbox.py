@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из таблицы исходящих, включая отложенные '
+        'повторные попытки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться: проверять очередь каждые --interval секунд'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = deliver_outbox(options['batch_size'])
+            if delivered or not options['loop']:
+                self.stdout.write(f'Отправлено писем: {delivered}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
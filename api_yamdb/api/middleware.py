@@ -0,0 +1,76 @@
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = 'X-Query-Count'
+# Списки параметров IN (%s, %s, ...) разной длины — один и тот же запрос.
+IN_PARAMS_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+# Управление транзакциями повторяется при любой записи, это не N+1.
+TRANSACTION_PATTERN = re.compile(
+    r'(?:BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE SAVEPOINT)\b',
+    re.IGNORECASE
+)
+
+
+def query_shape(sql):
+    """Текст запроса без значений: одинаков для повторов с разными id."""
+    return IN_PARAMS_PATTERN.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """
+    Обёртка execute_wrapper, считающая запросы по форме.
+
+    Число запросов включает управление транзакциями, а формы — нет.
+    """
+
+    def __init__(self):
+        self.shapes = Counter()
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        if not TRANSACTION_PATTERN.match(sql.lstrip()):
+            self.shapes[query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        return [
+            (shape, count) for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryInspectorMiddleware:
+    """
+    Учёт запросов к БД для отладки и замеров.
+
+    Считает запросы каждого HTTP-запроса, отдаёт их число в заголовке
+    X-Query-Count и пишет предупреждение, если запрос одной формы
+    повторился QUERY_INSPECTOR_REPEAT_THRESHOLD раз и больше — типичный
+    признак N+1. Включается настройкой QUERY_INSPECTOR_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.QUERY_INSPECTOR_REPEAT_THRESHOLD
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connections['default'].execute_wrapper(recorder):
+            response = self.get_response(request)
+        response[QUERY_COUNT_HEADER] = recorder.count
+        for shape, count in recorder.repeated(self.threshold):
+            logger.warning(
+                '%s %s: запрос выполнен %d раз (возможен N+1): %s',
+                request.method, request.path, count, shape
+            )
+        return response
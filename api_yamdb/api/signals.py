@@ -0,0 +1,98 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, Review, Title
+from reviews.signals import catalogue_changed
+from users.models import CustomUser
+from users.signals import access_changed
+from .v1.authentication import delete_role_version, publish_role_versions
+from .v1.cache import invalidate_namespaces
+
+ROLE_VERSION_BATCH_SIZE = 1000
+
+INVALIDATED_NAMESPACES = {
+    Title: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+    Review: ('titles',),
+}
+
+
+class PendingNamespaces(threading.local):
+    """Пространства, которые сбросит ближайший обработчик on_commit."""
+
+    def __init__(self):
+        self.namespaces = set()
+
+
+pending = PendingNamespaces()
+
+
+def flush_namespaces():
+    if pending.namespaces:
+        namespaces = tuple(pending.namespaces)
+        pending.namespaces.clear()
+        invalidate_namespaces(*namespaces)
+
+
+def invalidate_on_commit(namespaces):
+    """
+    Сбрасывает пространства после фиксации транзакции.
+
+    Каскадное удаление вызывает сигналы для каждой строки: пространства
+    копятся, и первый обработчик после фиксации сбрасывает их одним
+    UPDATE, а остальные ничего не делают.
+    """
+    pending.namespaces.update(namespaces)
+    transaction.on_commit(flush_namespaces)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_response_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов каталога после записи в связанные модели."""
+    if sender in INVALIDATED_NAMESPACES:
+        invalidate_on_commit(INVALIDATED_NAMESPACES[sender])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_response_cache_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_on_commit(INVALIDATED_NAMESPACES[Title])
+
+
+@receiver(catalogue_changed)
+def invalidate_response_cache_on_bulk_change(sender, **kwargs):
+    """Массовая запись не вызывает сигналы моделей: сбрасываем всё."""
+    invalidate_on_commit(('titles', 'genres', 'categories'))
+
+
+@receiver(post_save, sender=CustomUser)
+def update_role_version(sender, instance, raw=False, **kwargs):
+    """Публикует версию прав в кэш для RoleJWTAuthentication."""
+    if not raw:
+        transaction.on_commit(lambda: publish_role_versions(
+            {instance.pk: instance.role_version}
+        ))
+
+
+@receiver(access_changed, sender=CustomUser)
+def update_role_versions(sender, user_ids, **kwargs):
+    """Публикует версии прав после массового изменения пользователей."""
+    def publish():
+        for start in range(0, len(user_ids), ROLE_VERSION_BATCH_SIZE):
+            publish_role_versions(dict(
+                CustomUser.objects.filter(
+                    pk__in=user_ids[start:start + ROLE_VERSION_BATCH_SIZE]
+                ).values_list('pk', 'role_version')
+            ))
+    transaction.on_commit(publish)
+
+
+@receiver(post_delete, sender=CustomUser)
+def forget_role_version(sender, instance, **kwargs):
+    """Токены удалённого пользователя снова проверяются по БД."""
+    transaction.on_commit(lambda: delete_role_version(instance.pk))
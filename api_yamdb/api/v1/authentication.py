@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import CustomUser
+
+ROLE_VERSION_KEY_TEMPLATE = 'auth:role-version:{user_id}'
+ROLE_CLAIMS = ('role', 'is_superuser', 'role_version')
+
+
+def get_role_version(user_id):
+    """Текущая версия прав пользователя из кэша или None."""
+    return cache.get(ROLE_VERSION_KEY_TEMPLATE.format(user_id=user_id))
+
+
+def set_role_version(user_id, version):
+    cache.set(
+        ROLE_VERSION_KEY_TEMPLATE.format(user_id=user_id),
+        version,
+        timeout=settings.ROLE_VERSION_CACHE_TIMEOUT
+    )
+
+
+def publish_role_versions(versions):
+    """
+    Публикует версии прав {id пользователя: версия}, только повышая их.
+
+    Запрос, загрузивший строку пользователя до смены роли, публикует
+    старую версию уже после новой; понижение вернуло бы доверие токенам
+    со старой ролью. Версии живут ROLE_VERSION_CACHE_TIMEOUT секунд:
+    кэш может быть у каждого процесса своим, а смену роли публикует
+    только обработавший её процесс.
+    """
+    keys = {
+        ROLE_VERSION_KEY_TEMPLATE.format(user_id=user_id): version
+        for user_id, version in versions.items()
+    }
+    current = cache.get_many(keys)
+    cache.set_many(
+        {
+            key: version for key, version in keys.items()
+            if key not in current or current[key] < version
+        },
+        timeout=settings.ROLE_VERSION_CACHE_TIMEOUT
+    )
+
+
+def delete_role_version(user_id):
+    cache.delete(ROLE_VERSION_KEY_TEMPLATE.format(user_id=user_id))
+
+
+class RoleAccessToken(AccessToken):
+    """Access-токен с ролью, правами суперпользователя и версией прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token['role_version'] = user.role_version
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Пользователь, собранный из claims токена без запроса к БД.
+
+    Достаточен для проверки прав (is_admin, is_moderator, сравнение
+    по id), но не содержит остальных полей профиля.
+    """
+
+    RoleChoises = CustomUser.RoleChoises
+    is_admin = CustomUser.is_admin
+    is_moderator = CustomUser.is_moderator
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+
+class RoleJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя на чтение.
+
+    Для безопасных методов пользователь строится из claims токена,
+    если версия прав в токене не старше текущей версии из кэша.
+    Запись, токены без claims роли, устаревшие токены и промах кэша
+    загружают пользователя из БД; после загрузки версия кэшируется
+    на ROLE_VERSION_CACHE_TIMEOUT секунд, так что смена роли в другом
+    процессе с отдельным кэшем действует не позже чем через это время.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if (
+            request.method in SAFE_METHODS
+            and self.is_token_current(validated_token)
+        ):
+            return RoleTokenUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def is_token_current(self, validated_token):
+        if not all(claim in validated_token for claim in ROLE_CLAIMS):
+            return False
+        version = get_role_version(
+            validated_token.get(api_settings.USER_ID_CLAIM)
+        )
+        return (
+            version is not None
+            and validated_token['role_version'] >= version
+        )
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        publish_role_versions({user.pk: user.role_version})
+        return user
@@ -0,0 +1,106 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from reviews.models import CatalogueVersion
+
+RESPONSE_KEY_TEMPLATE = 'api:response-cache:{namespace}:{version}:{digest}'
+CACHED_HEADERS = ('Content-Type', 'Allow', 'Vary', 'ETag', 'Last-Modified')
+
+
+def get_namespace_version(namespace):
+    """
+    Возвращает текущую версию пространства ключей кэша.
+
+    Версия читается из БД одним запросом по уникальному индексу:
+    её меняют и процессы сервера, и команды управления, а кэш
+    Django может быть у каждого процесса своим.
+    """
+    versions = CatalogueVersion.objects.filter(namespace=namespace)
+    version = versions.values_list('version', flat=True).first()
+    if version is None:
+        version = versions.get_or_create(
+            namespace=namespace, defaults={'version': time.time_ns()}
+        )[0].version
+    return version
+
+
+def invalidate_namespaces(*namespaces):
+    """
+    Сбрасывает кэш ответов, меняя версию пространств ключей.
+
+    Старые записи не удаляются явно: они становятся недостижимыми
+    и вытесняются бэкендом кэша по таймауту. Версией служит время
+    в наносекундах, поэтому новая версия не совпадает с прежними.
+    """
+    version = time.time_ns()
+    updated = CatalogueVersion.objects.filter(
+        namespace__in=namespaces
+    ).update(version=version)
+    if updated < len(namespaces):
+        CatalogueVersion.objects.bulk_create(
+            [
+                CatalogueVersion(namespace=namespace, version=version)
+                for namespace in namespaces
+            ],
+            ignore_conflicts=True
+        )
+
+
+def is_cacheable_request(request):
+    """Кэшируются только анонимные GET-запросы."""
+    return (
+        request.method == 'GET'
+        and 'HTTP_AUTHORIZATION' not in request.META
+    )
+
+
+def get_response_cache_key(request, namespace, version):
+    """
+    Ключ кэша по адресу запроса с нормализованной строкой запроса.
+
+    Параметры сортируются, поэтому `?year=1&name=a` и `?name=a&year=1`
+    попадают в одну запись. Схема и хост входят в ключ, так как ответ
+    содержит абсолютные ссылки пагинации; заголовок Accept — так как
+    от него зависит формат ответа.
+    """
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    raw_key = '\n'.join((
+        request.build_absolute_uri(request.path),
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+    ))
+    return RESPONSE_KEY_TEMPLATE.format(
+        namespace=namespace,
+        version=version,
+        digest=hashlib.md5(raw_key.encode('utf-8')).hexdigest(),
+    )
+
+
+def get_cached_response(key):
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    content, status, headers = cached
+    response = HttpResponse(content, status=status)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def set_cached_response(key, response):
+    response.render()
+    headers = {
+        header: response[header]
+        for header in CACHED_HEADERS
+        if response.has_header(header)
+    }
+    cache.set(
+        key,
+        (response.content, response.status_code, headers),
+        settings.API_RESPONSE_CACHE_TIMEOUT
+    )
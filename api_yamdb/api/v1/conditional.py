@@ -0,0 +1,43 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+def make_etag(request, *parts):
+    """
+    ETag по версии ресурса, пути с параметрами запроса и формату ответа:
+    от параметров зависят фильтры и страница списка.
+    """
+    raw_key = '\n'.join((
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        *map(str, parts),
+    ))
+    return quote_etag(hashlib.md5(raw_key.encode('utf-8')).hexdigest())
+
+
+def get_not_modified_response(request, etag, last_modified, response=None):
+    """
+    Возвращает 304, если If-None-Match или If-Modified-Since
+    совпадают с версией ресурса, иначе response.
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+
+
+def get_cached_not_modified_response(request, response):
+    """304 для ответа из кэша по его сохранённым ETag и Last-Modified."""
+    return get_not_modified_response(
+        request,
+        response.get('ETag'),
+        parse_http_date_safe(response.get('Last-Modified')),
+        response
+    )
@@ -1,6 +1,9 @@
 import django_filters
+from rest_framework import filters
 
+from reviews.fields import normalize_text
 from reviews.models import Title
+from reviews.search import TrigramTitleIndex, get_title_search_backend
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -14,11 +17,48 @@ class TitleFilter(django_filters.FilterSet):
         field_name='category__slug',
         lookup_expr='exact'
     )
-    name = django_filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains'
-    )
+    name = django_filters.CharFilter(method='filter_name')
+    search = django_filters.CharFilter(method='filter_search')
+    fuzzy = django_filters.CharFilter(method='filter_fuzzy')
 
     class Meta:
         model = Title
-        fields = ('genre', 'category', 'name', 'year')
+        fields = ('genre', 'category', 'name', 'year', 'search', 'fuzzy')
+
+    def filter_name(self, queryset, name, value):
+        """Поиск подстроки без учёта регистра, в том числе кириллицы."""
+        return queryset.filter(name_normalized__contains=normalize_text(value))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        return get_title_search_backend().filter(queryset, value)
+
+    def filter_fuzzy(self, queryset, name, value):
+        """Нечёткий поиск по названию, устойчивый к опечаткам."""
+        return TrigramTitleIndex().filter(queryset, value)
+
+
+class NormalizedSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter для нормализованных теневых полей (NormalizedCharField).
+
+    Термины поиска приводятся к нижнему регистру в Python, поэтому
+    сравнение регистрозависимое и работает для кириллицы. Префикс `^`
+    в search_fields ищет по началу строки диапазоном, использующим индекс.
+    """
+
+    lookup_prefixes = {
+        **filters.SearchFilter.lookup_prefixes,
+        '^': 'prefix',
+    }
+
+    def get_search_terms(self, request):
+        return [
+            normalize_text(term) for term in super().get_search_terms(request)
+        ]
+
+    def construct_search(self, field_name):
+        lookup = self.lookup_prefixes.get(field_name[0])
+        if lookup:
+            return f'{field_name[1:]}__{lookup}'
+        return f'{field_name}__contains'
@@ -1,7 +1,15 @@
-from rest_framework import filters, mixins, permissions, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import SAFE_METHODS
 
+from . import cache
+from .conditional import (
+    get_cached_not_modified_response,
+    get_not_modified_response,
+    make_etag,
+    set_validators
+)
+from .filters import NormalizedSearchFilter
 from .permissions import IsAdminOrSuperuser
 
 
@@ -14,7 +22,27 @@ class ReadOnlyOrAdminPermissionMixin:
         return (permissions.IsAuthenticated(), IsAdminOrSuperuser(),)
 
 
+class ThrottleFirstMixin:
+    """
+    Миксин проверки ограничений частоты до аутентификации.
+
+    APIView.initial проверяет ограничения после аутентификации и прав,
+    а аутентификация записи загружает пользователя из БД. Ограничители
+    api.v1.throttling обходятся без БД, поэтому здесь они вызываются
+    первыми и запрос сверх лимита отклоняется без запросов к базе.
+    """
+
+    def perform_authentication(self, request):
+        super().check_throttles(request)
+        super().perform_authentication(request)
+
+    def check_throttles(self, request):
+        # Уже проверено в perform_authentication.
+        pass
+
+
 class GenreCategoryMixin(
+    ThrottleFirstMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -24,5 +52,96 @@ class GenreCategoryMixin(
 
     lookup_field = 'slug'
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_normalized',)
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Миксин кэширования ответов на анонимные GET-запросы.
+
+    Ответ ищется в кэше до аутентификации; к БД нужен только запрос
+    версии. Ключи версионируются по `cache_namespace`, версии
+    сбрасываются сигналами при записи в связанные модели
+    (см. api.signals).
+    """
+
+    cache_namespace = None
+
+    def get_namespace_version(self):
+        """Версия пространства ключей; читается не больше раза за запрос."""
+        if not hasattr(self, '_namespace_version'):
+            self._namespace_version = cache.get_namespace_version(
+                self.cache_namespace
+            )
+        return self._namespace_version
+
+    def dispatch(self, request, *args, **kwargs):
+        key = None
+        if cache.is_cacheable_request(request):
+            key = cache.get_response_cache_key(
+                request, self.cache_namespace, self.get_namespace_version()
+            )
+            response = cache.get_cached_response(key)
+            if response is not None:
+                return get_cached_not_modified_response(request, response)
+        response = super().dispatch(request, *args, **kwargs)
+        if key is not None and response.status_code == 200:
+            cache.set_cached_response(key, response)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Миксин условных GET-запросов (ETag и Last-Modified).
+
+    До выборки объектов версия ресурса читается одним запросом
+    по индексу: get_object_version() возвращает дату изменения объекта,
+    get_list_version() — дату последнего изменения и число записей
+    списка. None означает, что ресурса нет, и запрос обрабатывается
+    как обычно. Если If-None-Match или If-Modified-Since совпадают
+    с версией, отдаётся 304 без выборки и сериализации.
+    """
+
+    def get_object_version(self):
+        raise NotImplementedError
+
+    def get_list_version(self):
+        raise NotImplementedError
+
+    def get_version(self, get_version):
+        try:
+            return get_version()
+        except (TypeError, ValueError):
+            # Некорректный id в URL: обычная обработка вернёт 404.
+            return None
+
+    def conditional_response(self, version, handler, *args, **kwargs):
+        if version is None:
+            return handler(*args, **kwargs)
+        last_modified, *parts = version
+        etag = make_etag(self.request, last_modified, *parts)
+        timestamp = None
+        if last_modified is not None:
+            timestamp = int(last_modified.timestamp())
+        response = get_not_modified_response(self.request, etag, timestamp)
+        if response is None:
+            response = handler(*args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            set_validators(response, etag, timestamp)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = self.get_version(self.get_object_version)
+        return self.conditional_response(
+            None if updated_at is None else (updated_at,),
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_version(self.get_list_version),
+            super().list, request, *args, **kwargs
+        )
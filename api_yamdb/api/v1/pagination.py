@@ -0,0 +1,288 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework import filters
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset/seek): без COUNT(*) и без OFFSET.
+
+    Курсор хранит значения полей сортировки последнего объекта страницы,
+    следующая страница выбирается условием «строго после этого кортежа».
+    Поэтому стоимость любой страницы одинакова при наличии индекса
+    по полям сортировки. К сортировке всегда добавляется `pk`,
+    чтобы кортеж был уникальным. NULL считается наименьшим значением.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            (name, self.get_field(queryset, name))
+            for name, _ in self.ordering
+        ]
+        position, reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+        self.reverse = reverse
+
+        ordering = [
+            (name, descending != reverse) for name, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*(
+            self.order_expression(name, descending)
+            for name, descending in ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Возвращает список пар (поле, по убыванию) с `pk` в конце.
+
+        Учитывает параметр `ordering` фильтра OrderingFilter вьюсета,
+        иначе — сортировку queryset или модели.
+        """
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, filters.OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = (
+                queryset.query.order_by or queryset.model._meta.ordering
+            )
+        pk_name = queryset.model._meta.pk.name
+        result = []
+        for field in ordering:
+            name = field.lstrip('-')
+            if name == 'pk':
+                name = pk_name
+            result.append((name, field.startswith('-')))
+        if pk_name not in (name for name, _ in result):
+            # Направление `pk` совпадает с последним полем сортировки:
+            # так кортеж целиком читается из составного индекса.
+            result.append((pk_name, result[-1][1] if result else False))
+        return result
+
+    @staticmethod
+    def get_field(queryset, name):
+        """
+        Поле модели или аннотации queryset.
+
+        Аннотации (например, ранг поиска `search_rank`) сортируются и
+        фильтруются так же, как поля, а их значения хранятся в курсоре.
+        """
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def order_expression(name, descending):
+        if descending:
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_first=True)
+
+    @staticmethod
+    def condition(name, descending, value, strict):
+        """Условие «после value» (strict) или «равно value» для поля."""
+        if not strict:
+            if value is None:
+                return Q(**{f'{name}__isnull': True})
+            return Q(**{name: value})
+        if value is None:
+            if descending:
+                return Q(pk__in=())
+            return Q(**{f'{name}__isnull': False})
+        lookup = 'lt' if descending else 'gt'
+        condition = Q(**{f'{name}__{lookup}': value})
+        if descending:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def bound(self, name, descending, value):
+        """
+        Нестрогая граница по первому полю сортировки.
+
+        Избыточна логически, но даёт СУБД диапазон для поиска по индексу
+        вместо фильтрации всех строк до курсора.
+        """
+        nullable = dict(self.fields)[name].null
+        if value is None:
+            if descending:
+                return Q(**{f'{name}__isnull': True})
+            return Q()
+        lookup = 'lte' if descending else 'gte'
+        condition = Q(**{f'{name}__{lookup}': value})
+        if descending and nullable:
+            condition |= Q(**{f'{name}__isnull': True})
+        return condition
+
+    def after(self, ordering, position):
+        """Строит условие для кортежа, идущего после position."""
+        branches = []
+        for index, (name, descending) in enumerate(ordering):
+            parts = [
+                self.condition(prev_name, prev_descending, prev_value, False)
+                for (prev_name, prev_descending), prev_value in zip(
+                    ordering[:index], position[:index]
+                )
+            ]
+            parts.append(
+                self.condition(name, descending, position[index], True)
+            )
+            branches.append(reduce(and_, parts))
+        name, descending = ordering[0]
+        return self.bound(name, descending, position[0]) & reduce(
+            or_, branches
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            values = payload['p']
+            reverse = bool(payload.get('r'))
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [
+                None if value is None else field.to_python(value)
+                for (_, field), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        values = [
+            self.serialize_value(getattr(obj, name))
+            for name, _ in self.fields
+        ]
+        payload = {'p': values}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def serialize_value(value):
+        if value is None or isinstance(value, (int, float, str)):
+            return value
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def get_next_link(self):
+        if not self.page:
+            return None
+        if self.reverse or self.has_more:
+            return self.encode_cursor(self.page[-1], reverse=False)
+        return None
+
+    def get_previous_link(self):
+        if not self.page:
+            return None
+        if (self.reverse and self.has_more) or (
+            not self.reverse and self.has_cursor
+        ):
+            return self.encode_cursor(self.page[0], reverse=True)
+        return None
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class OptInKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация с включаемым режимом курсора.
+
+    По умолчанию работает как PageNumberPagination. Режим курсора
+    включается параметром `?pagination=cursor` либо наличием `cursor`
+    в запросе; ссылки next/previous сохраняют режим.
+    """
+
+    mode_query_param = 'pagination'
+    keyset_pagination_class = KeysetPagination
+
+    def keyset_requested(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_requested(request):
+            self.keyset = self.keyset_pagination_class()
+            self.keyset.page_size = self.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
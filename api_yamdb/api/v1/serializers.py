@@ -1,11 +1,17 @@
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
 from users.models import CustomUser
 from users.validators import validate_username_is_allowed
 from reviews.constants import MAX_NAME_LENGTH
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (
+    Category, Comment, Genre, ImportJob, Review, Title
+)
+from .fields import BulkSlugRelatedField
+from .services import ImportJobService
 
 
 class SignUpSerializer(serializers.ModelSerializer):
@@ -101,24 +107,27 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
     score = serializers.IntegerField(min_value=1, max_value=10)
 
-    def validate(self, data):
+    def create(self, validated_data):
         """
-        Валидатор на ограничение количества отзывов.
+        Создаёт отзыв одним INSERT.
 
-        Пользователь может оставлять только
-        один отзыв к одному произведению.
+        Правило «один отзыв на произведение» обеспечивает ограничение
+        unique_review: при его нарушении возвращается ошибка валидации,
+        и проверка корректна и при одновременных запросах.
         """
-
-        request = self.context.get('request')
-        if request and request.method == 'POST':
-            title_id = self.context.get('view').kwargs.get('title_id')
-            if Review.objects.filter(
-                title_id=title_id, author=request.user
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
             ).exists():
-                raise ValidationError(
-                    "Можно оставить только один отзыв на произведение."
-                )
-        return data
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Можно оставить только один отзыв на произведение.'
+                ]
+            })
 
     class Meta:
         model = Review
@@ -160,7 +169,7 @@ class TitleReadSerializer(serializers.ModelSerializer):
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для создания и обновления произведений."""
 
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True,
@@ -184,3 +193,29 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Используем сериализатор для чтения после сохранения."""
         return TitleReadSerializer(instance, context=self.context).data
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор загрузки CSV: принимает тип данных и файл,
+    возвращает состояние фоновой обработки.
+    """
+
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = (
+            'id', 'entity', 'file', 'status', 'processed', 'skipped',
+            'error_count', 'errors', 'message', 'created', 'finished'
+        )
+        read_only_fields = (
+            'status', 'processed', 'skipped', 'error_count', 'errors',
+            'message', 'created', 'finished'
+        )
+
+    def create(self, validated_data):
+        validated_data['file_path'] = ImportJobService.spool(
+            validated_data.pop('file')
+        )
+        return super().create(validated_data)
@@ -1,5 +1,17 @@
-from django.core.mail import send_mail
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
 from django.contrib.auth.tokens import default_token_generator
+from django.db import connections, transaction
+
+from reviews.importing import run_import_job
+from users.models import OutgoingEmail
+from users.outbox import deliver_outbox, next_attempt_delay
+from .cache import invalidate_namespaces
 
 
 class ConfirmationCodeService:
@@ -19,14 +31,12 @@ class ConfirmationCodeService:
     @staticmethod
     def send_confirmation_code_email(user, code):
         """
-        Отправляет код подтверждения на email пользователя.
+        Ставит письмо с кодом подтверждения в очередь исходящих.
         """
-        send_mail(
+        EmailOutboxService.enqueue(
             subject='Ваш код подтверждения',
             message=f'Код: {code}',
-            from_email=None,
-            recipient_list=[user.email],
-            fail_silently=False,
+            recipient=user.email,
         )
 
     @classmethod
@@ -44,3 +54,107 @@ class ConfirmationCodeService:
         Проверяет корректность кода подтверждения для пользователя.
         """
         return default_token_generator.check_token(user, code)
+
+
+class EmailOutboxService:
+    """
+    Отправка писем через таблицу исходящих.
+
+    Письмо записывается в транзакции запроса, а после её фиксации
+    фоновый поток отправляет накопившиеся письма пакетами, так что
+    запрос не ждёт почтовый сервер. Неудачные письма повторяются
+    с удваивающейся задержкой: поток сам просыпается к ближайшей
+    попытке. Письма, оставшиеся после перезапуска процесса, отправляет
+    команда send_outbox. При EMAIL_OUTBOX_EAGER письма отправляются
+    сразу после фиксации в том же потоке (для тестов).
+    """
+
+    executor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='email-outbox'
+    )
+    timer = None
+    timer_lock = threading.Lock()
+
+    @classmethod
+    def enqueue(cls, subject, message, recipient, from_email=''):
+        email = OutgoingEmail.objects.create(
+            subject=subject,
+            body=message,
+            recipient=recipient,
+            from_email=from_email
+        )
+        transaction.on_commit(cls.wake)
+        return email
+
+    @classmethod
+    def wake(cls):
+        if settings.EMAIL_OUTBOX_EAGER:
+            deliver_outbox()
+        else:
+            cls.executor.submit(cls.process)
+
+    @classmethod
+    def process(cls):
+        try:
+            deliver_outbox()
+            delay = next_attempt_delay()
+        finally:
+            connections.close_all()
+        if delay is not None:
+            cls.schedule(delay)
+
+    @classmethod
+    def schedule(cls, delay):
+        """Будит поток к ближайшей повторной попытке."""
+        with cls.timer_lock:
+            if cls.timer is not None:
+                cls.timer.cancel()
+            cls.timer = threading.Timer(delay, cls.wake)
+            cls.timer.daemon = True
+            cls.timer.start()
+
+
+class ImportJobService:
+    """
+    Сервис фоновой обработки загрузок CSV.
+
+    Импорт выполняется в отдельном потоке, поэтому обработчик запроса
+    не ждёт его окончания. Поток один: запись в базу идёт
+    последовательно, как в import_data.
+    """
+
+    executor = ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='import-job'
+    )
+
+    @staticmethod
+    def spool(upload):
+        """
+        Переносит загруженный файл в каталог загрузок и возвращает путь.
+        Временный файл перемещается без чтения в память.
+        """
+        os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+        extension = '.csv.gz' if upload.name.endswith('.gz') else '.csv'
+        path = os.path.join(
+            settings.IMPORT_UPLOAD_DIR, f'{uuid4().hex}{extension}'
+        )
+        if hasattr(upload, 'temporary_file_path'):
+            file_move_safe(upload.temporary_file_path(), path)
+        else:
+            with open(path, 'wb') as f:
+                for chunk in upload.chunks():
+                    f.write(chunk)
+        return path
+
+    @classmethod
+    def enqueue(cls, job):
+        """Ставит загрузку в очередь после фиксации транзакции."""
+        transaction.on_commit(lambda: cls.executor.submit(cls.process, job.pk))
+
+    @staticmethod
+    def process(job_id):
+        try:
+            run_import_job(job_id)
+            invalidate_namespaces('titles', 'genres', 'categories')
+        finally:
+            connections.close_all()
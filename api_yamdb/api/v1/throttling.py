@@ -0,0 +1,193 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.settings import (
+    api_settings as jwt_api_settings
+)
+
+from .authentication import RoleJWTAuthentication
+
+THROTTLE_KEY_TEMPLATE = 'api:throttle:{scope}:{ident}:{window}'
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Разбирает частоту вида '10/minute' в (число запросов, секунды)."""
+    if rate is None:
+        return None, None
+    number, period = rate.split('/')
+    return int(number), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Ограничение частоты по алгоритму скользящего окна.
+
+    Запросы считаются в окнах длиной в период частоты. Оценка числа
+    запросов за последний период — счётчик текущего окна плюс
+    счётчик предыдущего, взвешенный по ещё не прошедшей его доле.
+    Счётчики хранятся в кэше Django и меняются только атомарными
+    `add` и `incr`, поэтому параллельные запросы из разных процессов
+    не превышают лимит. Частоты берутся из
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] по области, None
+    отключает ограничение. Запрос сверх лимита в счётчиках не
+    остаётся.
+    """
+
+    timer = time.time
+
+    def get_scope(self, request, view):
+        raise NotImplementedError
+
+    def get_idents(self, request, view):
+        """Идентификаторы, для каждого из которых считаются запросы."""
+        raise NotImplementedError
+
+    def get_rate(self, scope):
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Не задана частота для области ограничения {scope!r}.'
+            )
+
+    def get_cache_key(self, scope, ident, window):
+        digest = hashlib.sha256(ident.encode()).hexdigest()[:32]
+        return THROTTLE_KEY_TEMPLATE.format(
+            scope=scope, ident=digest, window=window
+        )
+
+    @staticmethod
+    def increment(key, timeout):
+        """Атомарно увеличивает счётчик, создавая его при отсутствии."""
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Ключ истёк между add и incr.
+            cache.add(key, 0, timeout)
+            return cache.incr(key)
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        scope = self.get_scope(request, view)
+        number, duration = parse_rate(self.get_rate(scope))
+        if number is None:
+            return True
+        idents = self.get_idents(request, view)
+        if not idents:
+            return True
+        window, elapsed = divmod(self.timer(), duration)
+        # Счётчик нужен ещё одно окно как предыдущий.
+        timeout = 2 * duration + 1
+        window = int(window)
+        keys = [self.get_cache_key(scope, ident, window) for ident in idents]
+        previous_keys = [
+            self.get_cache_key(scope, ident, window - 1) for ident in idents
+        ]
+        found = cache.get_many(previous_keys)
+        previous = [found.get(key, 0) for key in previous_keys]
+        counts = [self.increment(key, timeout) for key in keys]
+        remaining = 1 - elapsed / duration
+        waits = []
+        for before, count in zip(previous, counts):
+            if before * remaining + count <= number:
+                continue
+            if count > number:
+                waits.append(duration - elapsed)
+            else:
+                # Предыдущее окно должно «остыть» настолько, чтобы
+                # запрос уместился в лимит.
+                waits.append(
+                    (remaining - (number - count) / before) * duration
+                )
+        if not waits:
+            return True
+        for key in keys:
+            try:
+                cache.decr(key)
+            except ValueError:
+                pass
+        self.wait_seconds = max(waits)
+        return False
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """
+    Ограничение по IP-адресу клиента.
+
+    Область — `throttle_scope` представления с суффиксом `_ip`.
+    """
+
+    def get_scope(self, request, view):
+        return f'{view.throttle_scope}_ip'
+
+    def get_idents(self, request, view):
+        return [self.get_ident(request)]
+
+
+class IdentifierThrottle(SlidingWindowThrottle):
+    """
+    Ограничение по значениям полей запроса (email, username).
+
+    Поля задаёт `throttle_identifier_fields` представления, область —
+    `throttle_scope` с суффиксом `_identifier`. Запрос считается для
+    каждого значения, так что перебор username при одном email не
+    обходит лимит.
+    """
+
+    def get_scope(self, request, view):
+        return f'{view.throttle_scope}_identifier'
+
+    def get_idents(self, request, view):
+        idents = []
+        for field in view.throttle_identifier_fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                idents.append(f'{field}:{value.strip().lower()}')
+        return idents
+
+
+class UserWriteThrottle(SlidingWindowThrottle):
+    """
+    Ограничение записи для пользователя.
+
+    Область — `write_throttle_scope` представления или 'writes'.
+    Пользователь определяется по claim токена без запроса к БД;
+    запросы без действительного токена не ограничиваются, их
+    отклонит аутентификация.
+    """
+
+    default_scope = 'writes'
+
+    def get_scope(self, request, view):
+        return getattr(view, 'write_throttle_scope', self.default_scope)
+
+    def get_idents(self, request, view):
+        if request.method in SAFE_METHODS:
+            return []
+        authentication = RoleJWTAuthentication()
+        header = authentication.get_header(request)
+        if header is None:
+            return []
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return []
+        try:
+            token = authentication.get_validated_token(raw_token)
+        except (AuthenticationFailed, InvalidToken):
+            return []
+        user_id = token.get(jwt_api_settings.USER_ID_CLAIM)
+        return [] if user_id is None else [f'user:{user_id}']
@@ -5,6 +5,7 @@ from .views import (
     CategoryViewSet,
     CommentViewSet,
     GenreViewSet,
+    ImportJobViewSet,
     ReviewViewSet,
     TitleViewSet,
     UserViewSet,
@@ -20,6 +21,7 @@ v1_router.register('users', UserViewSet, basename='user')
 v1_router.register('titles', TitleViewSet, basename='title')
 v1_router.register('genres', GenreViewSet, basename='genre')
 v1_router.register('categories', CategoryViewSet, basename='category')
+v1_router.register('imports', ImportJobViewSet, basename='import')
 v1_router.register(
     r'titles/(?P<title_id>\d+)/reviews',
     ReviewViewSet, basename='review'
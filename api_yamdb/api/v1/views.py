@@ -1,19 +1,34 @@
-from django.db.models import Avg
-from django.db.models.functions import Round
+from datetime import datetime, timezone
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, serializers, status, viewsets
+from rest_framework import (
+    filters, mixins, permissions, serializers, status, viewsets
+)
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
 from users.models import CustomUser
-from reviews.models import Category, Genre, Review, Title
-from .filters import TitleFilter
-from .mixins import GenreCategoryMixin, ReadOnlyOrAdminPermissionMixin
+from reviews.models import (
+    Category, Comment, Genre, ImportJob, Review, Title
+)
+from .authentication import RoleAccessToken
+from .filters import NormalizedSearchFilter, TitleFilter
+from .mixins import (
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    GenreCategoryMixin,
+    ReadOnlyOrAdminPermissionMixin,
+    ThrottleFirstMixin
+)
+from .pagination import OptInKeysetPagination
 from .permissions import IsAdminOrSuperuser, IsAuthorModeratorAdmin
 from .serializers import (
     AdminUserSerializer,
@@ -21,20 +36,26 @@ from .serializers import (
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
+    ImportJobSerializer,
     ReviewSerializer,
     TitleReadSerializer,
     TitleWriteSerializer,
     TokenByCodeSerializer,
     SignUpSerializer,
 )
-from .services import ConfirmationCodeService
+from .services import ConfirmationCodeService, ImportJobService
+from .throttling import IdentifierThrottle, IPThrottle
 
 
-class SignUpView(APIView):
+class SignUpView(ThrottleFirstMixin, APIView):
     """
     Регистрирует пользователя и отправляет код подтверждения на email.
     """
 
+    throttle_classes = (IPThrottle, IdentifierThrottle)
+    throttle_scope = 'signup'
+    throttle_identifier_fields = ('email', 'username')
+
     def post(self, request):
         email = request.data.get('email')
         username = request.data.get('username')
@@ -44,15 +65,17 @@ class SignUpView(APIView):
             username=username
         ).first()
 
-        if not user:
-            serializer = SignUpSerializer(data=request.data)
-            serializer.is_valid(raise_exception=True)
-            user = CustomUser.objects.create_user(
-                email=email,
-                username=username
-            )
-
-        ConfirmationCodeService.generate_and_send_code(user)
+        # Пользователь и письмо с кодом сохраняются вместе; письмо
+        # отправит фоновый поток после фиксации.
+        with transaction.atomic():
+            if not user:
+                serializer = SignUpSerializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+                user = CustomUser.objects.create_user(
+                    email=email,
+                    username=username
+                )
+            ConfirmationCodeService.generate_and_send_code(user)
 
         return Response(
             {'email': user.email, 'username': user.username},
@@ -60,11 +83,15 @@ class SignUpView(APIView):
         )
 
 
-class TokenByCodeView(APIView):
+class TokenByCodeView(ThrottleFirstMixin, APIView):
     """
     Принимает код подтверждения и выдаёт JWT-токен.
     """
 
+    throttle_classes = (IPThrottle, IdentifierThrottle)
+    throttle_scope = 'token'
+    throttle_identifier_fields = ('username',)
+
     def post(self, request):
         serializer = TokenByCodeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -74,12 +101,12 @@ class TokenByCodeView(APIView):
 
         user = get_object_or_404(CustomUser, username=username)
 
-        if not ConfirmationCodeService.validate_code(username, code):
+        if not ConfirmationCodeService.validate_code(user, code):
             raise serializers.ValidationError({
                 'confirmation_code': ['Неверный код подтверждения.']
             })
 
-        access = AccessToken.for_user(user)
+        access = RoleAccessToken.for_user(user)
 
         return Response(
             {'token': str(access)},
@@ -87,7 +114,7 @@ class TokenByCodeView(APIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ThrottleFirstMixin, viewsets.ModelViewSet):
     """
     Вьюсет для управления пользователями.
 
@@ -107,8 +134,8 @@ class UserViewSet(viewsets.ModelViewSet):
     serializer_class = AdminUserSerializer
 
     pagination_class = PageNumberPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('username_normalized',)
 
     @action(
         detail=False,
@@ -124,7 +151,10 @@ class UserViewSet(viewsets.ModelViewSet):
         PATCH — частичное обновление данных.
         """
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            # На чтение request.user собран из токена и не содержит профиля.
+            serializer = self.get_serializer(
+                get_object_or_404(CustomUser, pk=request.user.pk)
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         serializer = self.get_serializer(
@@ -137,24 +167,65 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+def parent_version(version):
+    """
+    Версия вложенного списка — строка родителя.
+
+    Запись и удаление дочерних записей меняют дату изменения родителя,
+    поэтому дочерние строки не агрегируются. Запрос версии заодно
+    проверяет, что родитель существует, так что отдельный
+    get_object_or_404 для списка не нужен.
+    """
+    if version is None:
+        raise Http404
+    return version
+
+
+class CommentViewSet(
+    ThrottleFirstMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """ViewSet для работы с комментариями (Comment)."""
 
+    write_throttle_scope = 'comment_writes'
+
     serializer_class = CommentSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly, IsAuthorModeratorAdmin)
+    pagination_class = OptInKeysetPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title_id=self.kwargs['title_id']
-        )
+        """Отзыв из URL; ищется не больше одного раза за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id']
+            )
+        return self._review
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        queryset = Comment.objects.select_related('author').filter(
+            review_id=self.kwargs['review_id']
+        )
+        if self.action == 'list':
+            # Принадлежность отзыва произведению уже проверил запрос версии.
+            return queryset
+        # Для чужого или несуществующего отзыва get_object() вернёт 404
+        # тем же запросом, без отдельной проверки родителя.
+        return queryset.filter(review__title_id=self.kwargs['title_id'])
+
+    def get_object_version(self):
+        return Comment.objects.filter(
+            pk=self.kwargs['pk'],
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id']
+        ).values_list('updated_at', flat=True).first()
+
+    def get_list_version(self):
+        return parent_version(Review.objects.filter(
+            pk=self.kwargs['review_id'], title_id=self.kwargs['title_id']
+        ).values_list('updated_at').first())
 
     def perform_create(self, serializer):
         review = self.get_review()
@@ -164,22 +235,45 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ThrottleFirstMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """ViewSet для работы с отзывами (Review)."""
 
+    write_throttle_scope = 'review_writes'
+
     serializer_class = ReviewSerializer
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         IsAuthorModeratorAdmin
     )
+    pagination_class = OptInKeysetPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+        """Произведение из URL; ищется не больше одного раза за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
 
     def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all()
+        # Для чужого или несуществующего произведения get_object()
+        # вернёт 404 тем же запросом, без отдельной проверки родителя.
+        return Review.objects.select_related('author').filter(
+            title_id=self.kwargs['title_id']
+        )
+
+    def get_object_version(self):
+        return Review.objects.filter(
+            pk=self.kwargs['pk'], title_id=self.kwargs['title_id']
+        ).values_list('updated_at', flat=True).first()
+
+    def get_list_version(self):
+        # Каждая запись отзыва пересчитывает рейтинг произведения, а
+        # вместе с ним дату изменения и сохранённое число отзывов.
+        return parent_version(Title.objects.filter(
+            pk=self.kwargs['title_id']
+        ).values_list('updated_at', 'reviews_count').first())
 
     def perform_create(self, serializer):
         title = self.get_title()
@@ -187,22 +281,23 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
 
 class TitleViewSet(
+    AnonymousResponseCacheMixin,
+    ThrottleFirstMixin,
+    ConditionalGetMixin,
     ReadOnlyOrAdminPermissionMixin,
     viewsets.ModelViewSet
 ):
     """ViewSet для работы с произведениями (Title)."""
 
+    cache_namespace = 'titles'
     queryset = (
-        Title.objects.annotate(
-            rating=Round(Avg('reviews__score'))
-        )
-        .select_related('category')
+        Title.objects.select_related('category')
         .prefetch_related('genre')
         .order_by(*Title._meta.ordering)
     )
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitleFilter
-    pagination_class = PageNumberPagination
+    pagination_class = OptInKeysetPagination
     ordering_fields = ('name', 'year', 'rating')
     http_method_names = ('get', 'post', 'patch', 'delete')
 
@@ -211,22 +306,80 @@ class TitleViewSet(
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_object_version(self):
+        return Title.objects.filter(pk=self.kwargs['pk']).values_list(
+            'updated_at', flat=True
+        ).first()
+
+    def get_list_version(self):
+        """
+        Версия всего каталога, а не отфильтрованной выборки: версия
+        пространства ключей кэша ответов. Её меняют любые записи
+        каталога, включая удаления и массовый импорт, а читается она
+        одним запросом по индексу.
+        """
+        version = self.get_namespace_version()
+        return (
+            datetime.fromtimestamp(version / 10 ** 9, tz=timezone.utc),
+            version
+        )
+
 
 class GenreViewSet(
+    AnonymousResponseCacheMixin,
     ReadOnlyOrAdminPermissionMixin,
     GenreCategoryMixin
 ):
     """ViewSet для работы с жанрами (Genre)."""
 
+    cache_namespace = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
 class CategoryViewSet(
+    AnonymousResponseCacheMixin,
     ReadOnlyOrAdminPermissionMixin,
     GenreCategoryMixin
 ):
     """ViewSet для работы с категориями (Category)."""
 
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+
+
+class ImportJobViewSet(
+    ThrottleFirstMixin,
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    """
+    Загрузка CSV администратором.
+
+    POST сохраняет файл на диск и сразу возвращает id задачи (202),
+    импорт идёт в фоне; GET по id показывает ход работы и ошибки строк.
+    """
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    permission_classes = (IsAuthenticated, IsAdminOrSuperuser)
+    parser_classes = (MultiPartParser,)
+    pagination_class = PageNumberPagination
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Файл пишется во временный файл на диске, а не в память.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+    def perform_create(self, serializer):
+        ImportJobService.enqueue(
+            serializer.save(created_by=self.request.user)
+        )
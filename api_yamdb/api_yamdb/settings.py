@@ -27,13 +27,32 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.RoleJWTAuthentication',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Число доверенных прокси перед приложением: IP клиента для лимитов
+    # берётся из X-Forwarded-For только на столько адресов от конца.
+    # 0 — заголовок игнорируется, используется REMOTE_ADDR.
+    'NUM_PROXIES': 0,
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.v1.throttling.UserWriteThrottle',
+    ),
+    # Скользящее окно: 'N/period' — не больше N запросов за период.
+    # None отключает ограничение области.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_identifier': '5/hour',
+        'token_ip': '60/hour',
+        'token_identifier': '10/hour',
+        'writes': '120/minute',
+        'review_writes': '30/minute',
+        'comment_writes': '60/minute',
+    },
 }
 
 MIDDLEWARE = [
+    'api.middleware.QueryInspectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +62,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Учёт запросов к БД и поиск N+1 для разработки и замеров; в продакшене
+# выключается вместе с DEBUG.
+QUERY_INSPECTOR_ENABLED = DEBUG
+QUERY_INSPECTOR_REPEAT_THRESHOLD = 3
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -64,6 +88,20 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Кэш хранит и версии прав пользователей (api.v1.authentication):
+# при нескольких процессах нужен общий бэкенд (Redis, Memcached).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+API_RESPONSE_CACHE_TIMEOUT = 300
+# Сколько секунд версия прав из кэша подтверждает роль в токене. Кэш
+# может быть у каждого процесса своим: смена роли в другом процессе
+# видна здесь не позже чем через это время.
+ROLE_VERSION_CACHE_TIMEOUT = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -105,5 +143,14 @@ AUTH_USER_MODEL = 'users.CustomUser'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 DEFAULT_FROM_EMAIL = 'noreply@example.com'
+# Письма отправляются фоновым потоком из таблицы исходящих (users.outbox).
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+# Задержка первой повторной попытки в секундах, дальше удваивается.
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Отправлять сразу после фиксации транзакции в потоке запроса.
+EMAIL_OUTBOX_EAGER = False
 
 PROHIBITED_NICKNAMES = {'me'}
+
+IMPORT_UPLOAD_DIR = BASE_DIR / 'imports'
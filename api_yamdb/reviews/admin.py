@@ -12,7 +12,7 @@ from .models import (
 class TitleAdmin(admin.ModelAdmin):
     """Административный интерфейс для модели Title (Произведения)."""
 
-    list_display = ('name', 'year', 'category')
+    list_display = ('name', 'year', 'category', 'rating', 'reviews_count')
     list_filter = ('year', 'category')
     search_fields = ('name', 'description')
     filter_horizontal = ('genre',)
@@ -3,3 +3,4 @@ MAX_NAME_LENGTH = 150
 MAX_EMAIL_LENGTH = 254
 MIN_SCORE = 1
 MAX_SCORE = 10
+MAX_SEARCH_TERM_LENGTH = 64
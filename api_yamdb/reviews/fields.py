@@ -0,0 +1,89 @@
+from django.db import models
+from django.db.models import Lookup
+
+
+def normalize_text(value):
+    """Приводит строку к виду для поиска без учёта регистра."""
+    return (value or '').casefold()
+
+
+class NormalizedCharField(models.CharField):
+    """
+    Теневое поле с нормализованной копией другого поля модели.
+
+    Значение вычисляется в pre_save, поэтому заполняется и при save(),
+    и при bulk_create(). SQLite сравнивает без учёта регистра только
+    ASCII, а поиск по этому полю корректен и для кириллицы.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_text(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+@NormalizedCharField.register_lookup
+class Prefix(Lookup):
+    """
+    Поиск по префиксу через диапазон `>= prefix AND < prefix + U+10FFFF`.
+
+    В отличие от LIKE 'x%', такой диапазон использует обычный индекс.
+    """
+
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        params = lhs_params + rhs_params + lhs_params + [
+            f'{rhs_params[0]}\U0010ffff'
+        ]
+        return f'{lhs} >= {rhs} AND {lhs} < {rhs}', params
+
+
+def backfill_normalized_fields(model, batch_size=1000):
+    """
+    Заполняет теневые поля модели пакетами по возрастанию pk.
+
+    Работает и с историческими моделями миграций. Возвращает число
+    обработанных записей.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, NormalizedCharField)
+    ]
+    if not fields:
+        return 0
+    manager = model._base_manager
+    sources = {field.source for field in fields}
+    last_pk = None
+    total = 0
+    while True:
+        queryset = manager.only('pk', *sources).order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset[:batch_size])
+        if not batch:
+            return total
+        for obj in batch:
+            for field in fields:
+                setattr(
+                    obj, field.attname,
+                    normalize_text(getattr(obj, field.source))
+                )
+        manager.bulk_update(batch, [field.name for field in fields])
+        total += len(batch)
+        last_pk = batch[-1].pk
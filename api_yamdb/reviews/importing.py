@@ -0,0 +1,857 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+from array import array
+from collections import deque, namedtuple
+from itertools import islice
+from operator import itemgetter
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import UniqueConstraint
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .constants import MAX_SCORE, MIN_SCORE
+from .fields import NormalizedCharField
+from .models import (
+    Category, Comment, Genre, ImportCheckpoint, ImportJob, Review, Title,
+    User
+)
+from .search import TrigramTitleIndex, get_title_search_backend
+from .signals import touch_authored
+from .validators import validate_year
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 10
+MAX_STORED_JOB_ERRORS = 100
+
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'temp_store': 'MEMORY',
+    'cache_size': '-262144',
+}
+
+
+def set_pragmas(pragmas):
+    """Устанавливает PRAGMA SQLite и возвращает их прежние значения."""
+    previous = {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}')
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+    return previous
+
+
+def drop_secondary_indexes(tables):
+    """
+    Удаляет неуникальные индексы таблиц и возвращает SQL для их
+    пересоздания. Уникальные индексы остаются: на них опирается
+    bulk_create(ignore_conflicts=True).
+    """
+    statements = []
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'PRAGMA index_list({quote_name(table)})')
+            names = [
+                name for _, name, unique, origin, *_ in cursor.fetchall()
+                if not unique and origin == 'c'
+            ]
+            for name in names:
+                cursor.execute(
+                    "SELECT sql FROM sqlite_master "
+                    "WHERE type = 'index' AND name = %s",
+                    [name]
+                )
+                statements.append(cursor.fetchone()[0])
+                cursor.execute(f'DROP INDEX {quote_name(name)}')
+    return statements
+
+
+def execute_statements(statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def data_file_path(data_path, filename):
+    """Путь к CSV; если его нет, но есть сжатый gzip-файл, — к нему."""
+    file_path = os.path.join(data_path, filename)
+    if not os.path.exists(file_path) and os.path.exists(f'{file_path}.gz'):
+        return f'{file_path}.gz'
+    return file_path
+
+
+def open_data_file(file_path):
+    open_file = gzip.open if file_path.endswith('.gz') else open
+    return open_file(file_path, 'rt', encoding='utf-8', newline='')
+
+
+def read_batches(file_path, batch_size):
+    """Потоково читает CSV и отдаёт строки списками по batch_size."""
+    with open_data_file(file_path) as f:
+        reader = csv.DictReader(f)
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                return
+            yield rows
+
+
+def existing_ids(model, ids):
+    """Возвращает множество id из ids, которые есть в базе."""
+    return set(
+        model.objects.filter(id__in=set(ids)).values_list('id', flat=True)
+    )
+
+
+def format_error(error):
+    if isinstance(error, ValidationError):
+        return '; '.join(error.messages)
+    if isinstance(error, KeyError):
+        return f'нет столбца {error}'
+    return str(error)
+
+
+def parse_rows(rows, parse_row):
+    """
+    Применяет parse_row к строкам пакета.
+
+    Возвращает (число строк, записи, ошибки, индексы записей), где
+    ошибки — пары (индекс строки в пакете, сообщение), а индексы
+    записей — индексы их строк в пакете.
+    """
+    records = []
+    errors = []
+    positions = []
+    for index, row in enumerate(rows):
+        if None in row:
+            errors.append((index, f'лишние значения: {row[None]}'))
+            continue
+        try:
+            records.append(parse_row(row))
+        except (KeyError, TypeError, ValueError, ValidationError) as error:
+            errors.append((index, format_error(error)))
+        else:
+            positions.append(index)
+    return len(rows), records, errors, positions
+
+
+def parse_datetime_value(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'некорректная дата: {value!r}')
+    return parsed
+
+
+def parse_user(row):
+    return {
+        'id': int(row['id']),
+        'username': row['username'],
+        'email': row['email'],
+        'role': row['role'],
+        'bio': row['bio'] or '',
+        'first_name': row['first_name'] or '',
+        'last_name': row['last_name'] or '',
+    }
+
+
+def parse_slugged(row):
+    return {'id': int(row['id']), 'name': row['name'], 'slug': row['slug']}
+
+
+def parse_title(row):
+    year = int(row['year'])
+    validate_year(year)
+    title = {
+        'id': int(row['id']),
+        'name': row['name'],
+        'year': year,
+        'category_id': int(row['category']),
+    }
+    # Описания нет в исходных CSV, но его выгружает export_data.
+    if 'description' in row:
+        title['description'] = row['description'] or None
+    return title
+
+
+def parse_genre_title(row):
+    return {
+        'title_id': int(row['title_id']),
+        'genre_id': int(row['genre_id']),
+    }
+
+
+def parse_review(row):
+    score = int(row['score'])
+    if not MIN_SCORE <= score <= MAX_SCORE:
+        raise ValueError(
+            f'оценка {score} вне диапазона {MIN_SCORE}..{MAX_SCORE}'
+        )
+    return {
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'score': score,
+        'pub_date': parse_datetime_value(row['pub_date']),
+    }
+
+
+def parse_comment(row):
+    return {
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'text': row['text'],
+        'author_id': int(row['author']),
+        'created': parse_datetime_value(row['pub_date']),
+    }
+
+
+# Функции верхнего уровня, чтобы их можно было передать в пул процессов.
+def parse_users(rows):
+    return parse_rows(rows, parse_user)
+
+
+def parse_slugged_rows(rows):
+    return parse_rows(rows, parse_slugged)
+
+
+def parse_titles(rows):
+    return parse_rows(rows, parse_title)
+
+
+def parse_genre_titles(rows):
+    return parse_rows(rows, parse_genre_title)
+
+
+def parse_reviews(rows):
+    return parse_rows(rows, parse_review)
+
+
+def parse_comments(rows):
+    return parse_rows(rows, parse_comment)
+
+
+def parse_batches(parse, batches, executor=None, window=None):
+    """
+    Разбирает пакеты строк, при наличии executor — в пуле процессов.
+
+    batches — пары (ключ, строки), результат — пары (ключ, разбор).
+    В работе одновременно не больше window пакетов, поэтому память
+    не растёт с размером файла. Порядок пакетов сохраняется.
+    """
+    if executor is None:
+        for key, rows in batches:
+            yield key, parse(rows)
+        return
+    pending = deque()
+    for key, rows in batches:
+        pending.append((key, executor.submit(parse, rows)))
+        if len(pending) >= window:
+            key, future = pending.popleft()
+            yield key, future.result()
+    while pending:
+        key, future = pending.popleft()
+        yield key, future.result()
+
+
+def touch_renamed_authors(users):
+    """
+    bulk_update не вызывает сигналы: для пользователей, чьё имя
+    меняется, даты изменения авторских записей обновляются явно.
+    """
+    usernames = dict(
+        User.objects.filter(
+            pk__in=[user.pk for user in users]
+        ).values_list('pk', 'username')
+    )
+    renamed = [
+        user.pk for user in users if usernames.get(user.pk) != user.username
+    ]
+    if renamed:
+        touch_authored(renamed)
+
+
+# Вызываются с существующими объектами пакета перед bulk_update.
+BEFORE_UPDATE = {User: touch_renamed_authors}
+
+
+def unique_field_sets(model):
+    """Наборы attname полей, значения которых уникальны, кроме id."""
+    opts = model._meta
+    names = [
+        (field.name,) for field in opts.concrete_fields
+        if field.unique and not field.primary_key
+    ]
+    names.extend(opts.unique_together)
+    names.extend(
+        constraint.fields for constraint in opts.constraints
+        if isinstance(constraint, UniqueConstraint)
+        and constraint.condition is None
+    )
+    return [
+        tuple(opts.get_field(name).attname for name in fields)
+        for fields in names
+    ]
+
+
+def find_conflicts(model, candidates):
+    """
+    Ищет записи, нарушающие уникальность: совпадающие с объектом
+    в базе или с предыдущей записью пакета, у которых другой id.
+    bulk_create(ignore_conflicts=True) молча пропустил бы такие
+    записи, а bulk_update упал бы на них.
+
+    candidates — пары (индекс записи, объект). Возвращает пары
+    (индекс записи, сообщение).
+    """
+    conflicts = {}
+    for fields in unique_field_sets(model):
+        keys = {
+            index: tuple(getattr(obj, name) for name in fields)
+            for index, obj in candidates
+        }
+        owners = {
+            tuple(key): pk
+            for *key, pk in model.objects.filter(**{
+                f'{name}__in': {key[position] for key in keys.values()}
+                for position, name in enumerate(fields)
+            }).values_list(*fields, 'pk')
+        }
+        for index, obj in candidates:
+            key = keys[index]
+            if owners.setdefault(key, obj.pk) != obj.pk:
+                values = ', '.join(
+                    f'{name}={value}' for name, value in zip(fields, key)
+                )
+                conflicts.setdefault(index, f'уже есть запись с {values}')
+    return sorted(conflicts.items())
+
+
+def make_writer(model, references=(), update=True):
+    """
+    Возвращает функцию записи пакета записей в model.
+
+    references — пары (поле записи, модель); записи, ссылающиеся
+    на отсутствующие в базе объекты, пропускаются. Записи с id,
+    нарушающие уникальность, тоже пропускаются и возвращаются как
+    ошибки. Новые записи создаются через bulk_create, уже существующие
+    (по id) обновляются через bulk_update — так изменённые строки CSV
+    попадают в базу. При update=False существующие записи не ищутся:
+    только вставка.
+
+    Функция возвращает (объекты, ошибки), где ошибки — пары
+    (индекс записи, сообщение).
+    """
+    before_update = BEFORE_UPDATE.get(model)
+
+    def write(records):
+        known = {
+            field: existing_ids(
+                related, (record[field] for record in records)
+            )
+            for field, related in references
+        }
+        candidates = [
+            (index, model(**record))
+            for index, record in enumerate(records)
+            if all(record[field] in known[field] for field in known)
+        ]
+        conflicts = []
+        if candidates and 'id' in records[0]:
+            conflicts = find_conflicts(model, candidates)
+            rejected = {index for index, _ in conflicts}
+            candidates = [
+                (index, obj) for index, obj in candidates
+                if index not in rejected
+            ]
+        objects = [obj for _, obj in candidates]
+        if not update or not objects or 'id' not in records[0]:
+            model.objects.bulk_create(objects, ignore_conflicts=True)
+            return objects, conflicts
+        present = existing_ids(model, (obj.id for obj in objects))
+        model.objects.bulk_create(
+            [obj for obj in objects if obj.id not in present],
+            ignore_conflicts=True
+        )
+        if present:
+            fields = updatable_fields(model, records[0])
+            changed = [obj for obj in objects if obj.id in present]
+            for obj in changed:
+                for field in fields:
+                    if isinstance(field, NormalizedCharField) or getattr(
+                        field, 'auto_now', False
+                    ):
+                        field.pre_save(obj, add=False)
+            if before_update is not None:
+                before_update(changed)
+            model.objects.bulk_update(
+                changed, [field.name for field in fields]
+            )
+        return objects, conflicts
+    return write
+
+
+def updatable_fields(model, record):
+    """
+    Поля для обновления существующих записей: поля из записи, кроме id
+    и дат, которые Django ставит сам, зависящие от них теневые поля
+    и дата изменения (auto_now).
+    """
+    fields = [
+        model._meta.get_field(name) for name in record if name != 'id'
+    ]
+    fields = [
+        field for field in fields if not getattr(field, 'auto_now_add', False)
+    ]
+    fields.extend(
+        field for field in model._meta.concrete_fields
+        if (
+            isinstance(field, NormalizedCharField) and field.source in record
+            or getattr(field, 'auto_now', False)
+        )
+    )
+    return fields
+
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_digest(rows, batch_size):
+    """
+    Хеш пакета; размер пакета входит в хеш, так как задаёт границы.
+
+    Строки хешируются парами (столбец, значение) в порядке файла:
+    лишние значения csv.DictReader кладёт под ключ None, и сортировка
+    ключей на нём упала бы.
+    """
+    digest = hashlib.sha256(str(batch_size).encode())
+    digest.update(json.dumps(
+        [list(row.items()) for row in rows], ensure_ascii=False
+    ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class Checkpoints:
+    """
+    Контрольные точки одного файла в таблице ImportCheckpoint.
+
+    Пакет отмечается выполненным в той же транзакции, что и его запись.
+    Пакеты с пропущенными строками не отмечаются: ссылки на объекты
+    из других файлов могут появиться при следующем запуске.
+    """
+
+    def __init__(self, source, enabled=True):
+        self.source = source
+        self.enabled = enabled
+        self.digest = None
+        self.chunks = {}
+        if enabled:
+            self.chunks = dict(
+                ImportCheckpoint.objects.filter(
+                    source=source, chunk__isnull=False
+                ).values_list('chunk', 'digest')
+            )
+
+    def file_unchanged(self, digest):
+        """Запоминает хеш файла и сверяет его с сохранённым."""
+        self.digest = digest
+        return self.enabled and ImportCheckpoint.objects.filter(
+            source=self.source, chunk__isnull=True, digest=digest
+        ).exists()
+
+    def chunk_unchanged(self, index, digest):
+        return self.chunks.get(index) == digest
+
+    def save_chunk(self, index, digest):
+        ImportCheckpoint.objects.update_or_create(
+            source=self.source, chunk=index, defaults={'digest': digest}
+        )
+
+    def discard_chunk(self, index):
+        ImportCheckpoint.objects.filter(
+            source=self.source, chunk=index
+        ).delete()
+
+    def finish(self, chunks_count, complete):
+        """Удаляет лишние пакеты и запоминает хеш файла целиком."""
+        ImportCheckpoint.objects.filter(
+            source=self.source, chunk__gte=chunks_count
+        ).delete()
+        if complete:
+            ImportCheckpoint.objects.update_or_create(
+                source=self.source, chunk=None,
+                defaults={'digest': self.digest}
+            )
+        else:
+            ImportCheckpoint.objects.filter(
+                source=self.source, chunk__isnull=True
+            ).delete()
+
+
+class NoCheckpoints:
+    """Контрольные точки для разового импорта: ничего не хранит."""
+
+    def chunk_unchanged(self, index, digest):
+        return False
+
+    def save_chunk(self, index, digest):
+        pass
+
+    def discard_chunk(self, index):
+        pass
+
+    def finish(self, chunks_count, complete):
+        pass
+
+
+ImportResult = namedtuple(
+    'ImportResult', ('processed', 'skipped', 'errors', 'unchanged')
+)
+
+
+def import_rows(file_path, model, parse, write, batch_size,
+                checkpoints, executor=None, window=None, progress=None,
+                after_batch=None):
+    """
+    Импортирует CSV пакетами; каждый пакет — отдельная транзакция.
+
+    parse проверяет строки и приводит типы без обращения к БД и может
+    выполняться в других процессах; write в единственном
+    процессе-писателе сохраняет записи. Пакеты, хеш которых совпадает
+    с контрольной точкой, не разбираются и не записываются, поэтому
+    прерванный импорт продолжается с места ошибки.
+    Ошибки — пары (номер строки данных, сообщение).
+    """
+    processed = skipped = unchanged = chunks_count = 0
+    errors = []
+    complete = True
+
+    def changed_batches():
+        nonlocal unchanged, chunks_count
+        for index, rows in enumerate(read_batches(file_path, batch_size)):
+            chunks_count = index + 1
+            digest = chunk_digest(rows, batch_size)
+            if checkpoints.chunk_unchanged(index, digest):
+                unchanged += 1
+                continue
+            yield (index, digest, index * batch_size), rows
+
+    for (index, digest, offset), parsed in parse_batches(
+        parse, changed_batches(), executor, window
+    ):
+        rows_count, records, batch_errors, positions = parsed
+        with transaction.atomic():
+            objects, conflicts = write(records)
+            if after_batch is not None:
+                after_batch(objects)
+            if rows_count == len(objects):
+                checkpoints.save_chunk(index, digest)
+            else:
+                checkpoints.discard_chunk(index)
+                complete = False
+        batch_errors.extend(
+            (positions[index], message) for index, message in conflicts
+        )
+        errors.extend(
+            (offset + position + 1, message)
+            for position, message in sorted(batch_errors)
+        )
+        processed += len(objects)
+        skipped += rows_count - len(objects)
+        if progress is not None:
+            progress(processed, skipped)
+    checkpoints.finish(chunks_count, complete)
+    return ImportResult(processed, skipped, errors, unchanged)
+
+
+def index_titles(titles):
+    """bulk_create не вызывает сигналы: индексируем пакет явно."""
+    get_title_search_backend().index(titles)
+    TrigramTitleIndex().index(titles)
+
+
+def touch_commented_reviews(comments):
+    """
+    bulk_create не вызывает сигналы: дата изменения отзыва служит
+    версией списка его комментариев и обновляется явно.
+    """
+    Review.objects.filter(
+        pk__in={comment.review_id for comment in comments}
+    ).update(updated_at=timezone.now())
+
+
+class RatedTitles:
+    """
+    Собирает id произведений из записанных пакетов отзывов.
+
+    Передаётся в import_rows как after_batch: рейтинги пересчитываются
+    потом только для этих произведений, а не для всего каталога, так
+    что стоимость зависит от изменённых отзывов, а не от всей таблицы.
+    """
+
+    def __init__(self):
+        self.ids = set()
+
+    def __call__(self, reviews):
+        self.ids.update(review.title_id for review in reviews)
+
+    def update_ratings(self, batch_size=DEFAULT_BATCH_SIZE):
+        """Пересчитывает рейтинги собранных произведений пакетами."""
+        ids = sorted(self.ids)
+        for start in range(0, len(ids), batch_size):
+            with transaction.atomic():
+                Title.objects.filter(
+                    pk__in=ids[start:start + batch_size]
+                ).update_rating()
+        self.ids.clear()
+        return len(ids)
+
+
+IMPORTS = (
+    ('пользователей', 'users.csv', User, parse_users, (), None),
+    ('категорий', 'category.csv', Category, parse_slugged_rows, (), None),
+    ('жанров', 'genre.csv', Genre, parse_slugged_rows, (), None),
+    (
+        'произведений', 'titles.csv', Title, parse_titles,
+        (('category_id', Category),), index_titles
+    ),
+    (
+        'связей жанров', 'genre_title.csv', Title.genre.through,
+        parse_genre_titles, (('title_id', Title), ('genre_id', Genre)), None
+    ),
+    (
+        'отзывов', 'review.csv', Review, parse_reviews,
+        (('author_id', User), ('title_id', Title)), None
+    ),
+    (
+        'комментариев', 'comments.csv', Comment, parse_comments,
+        (('author_id', User), ('review_id', Review)), touch_commented_reviews
+    ),
+)
+
+
+def run_import_job(job_id):
+    """
+    Выполняет загрузку ImportJob тем же путём, что и import_data:
+    пакетами через bulk_create, обновляя ход работы после каждого пакета.
+    Загруженный файл после обработки удаляется.
+    """
+    jobs = ImportJob.objects.filter(pk=job_id)
+    job = jobs.get()
+    jobs.update(status=ImportJob.StatusChoices.RUNNING)
+    rated_titles = RatedTitles()
+    try:
+        _, _, model, parse, references, after_batch = next(
+            definition for definition in IMPORTS
+            if definition[1] == f'{job.entity}.csv'
+        )
+        if model is Review:
+            after_batch = rated_titles
+        result = import_rows(
+            job.file_path,
+            model,
+            parse,
+            make_writer(model, references),
+            DEFAULT_BATCH_SIZE,
+            NoCheckpoints(),
+            progress=lambda processed, skipped: jobs.update(
+                processed=processed, skipped=skipped
+            ),
+            after_batch=after_batch
+        )
+    except Exception as error:
+        jobs.update(
+            status=ImportJob.StatusChoices.FAILED,
+            message=str(error),
+            finished=timezone.now()
+        )
+    else:
+        jobs.update(
+            status=ImportJob.StatusChoices.DONE,
+            processed=result.processed,
+            skipped=result.skipped,
+            errors=[
+                {'line': line, 'message': message}
+                for line, message in result.errors[:MAX_STORED_JOB_ERRORS]
+            ],
+            error_count=len(result.errors),
+            finished=timezone.now()
+        )
+    finally:
+        # Записанные до ошибки пакеты тоже меняют рейтинги.
+        rated_titles.update_ratings()
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+
+def read_header(file_path):
+    with open_data_file(file_path) as f:
+        return next(csv.reader(f), [])
+
+
+def read_columns(file_path, names):
+    """
+    Читает из CSV только нужные столбцы и возвращает словарь
+    {столбец: кортеж значений}. В коротких строках недостающие
+    значения пустые.
+    """
+    header = read_header(file_path)
+    missing = [name for name in names if name not in header]
+    if missing:
+        raise ValueError(f'нет столбцов: {", ".join(missing)}')
+    indexes = [header.index(name) for name in names]
+    # Лишний индекс нужен, чтобы itemgetter всегда возвращал кортеж.
+    getter = itemgetter(*indexes, indexes[0])
+    padding = [''] * (max(indexes) + 1)
+
+    def read(pick):
+        with open_data_file(file_path) as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            # Пустые строки пропускаются, как в csv.DictReader.
+            return tuple(zip(*map(pick, filter(None, reader))))
+
+    try:
+        columns = read(getter)
+    except IndexError:
+        columns = read(lambda row: getter(row + padding))
+    if not columns:
+        return {name: () for name in names}
+    return dict(zip(names, columns))
+
+
+def to_ints(values):
+    """
+    Преобразует столбец в array('q'). Возвращает массив и индексы
+    строк, которые не являются целыми числами (в массиве на их месте 0).
+    """
+    try:
+        return array('q', map(int, values)), []
+    except ValueError:
+        pass
+    result = array('q', bytes(8 * len(values)))
+    invalid = []
+    for index, value in enumerate(values):
+        try:
+            result[index] = int(value)
+        except ValueError:
+            invalid.append(index)
+    return result, invalid
+
+
+def check_year(columns):
+    current_year = timezone.now().year
+    return [
+        (index, f'год {year} больше текущего ({current_year})')
+        for index, year in enumerate(columns['year'])
+        if year > current_year
+    ]
+
+
+def check_score(columns):
+    return [
+        (index, f'оценка {score} вне диапазона {MIN_SCORE}..{MAX_SCORE}')
+        for index, score in enumerate(columns['score'])
+        if not MIN_SCORE <= score <= MAX_SCORE
+    ]
+
+
+def check_unique_review(columns):
+    seen = set()
+    errors = []
+    for index, pair in enumerate(zip(columns['author'], columns['title_id'])):
+        if pair in seen:
+            errors.append(
+                (index, f'повторный отзыв автора {pair[0]} '
+                        f'на произведение {pair[1]}')
+            )
+        seen.add(pair)
+    return errors
+
+
+# Файл, целочисленные столбцы, ссылки (столбец, файл) и проверки строк.
+CHECKED_FILES = (
+    ('users.csv', ('id',), (), ()),
+    ('category.csv', ('id',), (), ()),
+    ('genre.csv', ('id',), (), ()),
+    (
+        'titles.csv', ('id', 'year', 'category'),
+        (('category', 'category.csv'),), (check_year,)
+    ),
+    (
+        'genre_title.csv', ('title_id', 'genre_id'),
+        (('title_id', 'titles.csv'), ('genre_id', 'genre.csv')), ()
+    ),
+    (
+        'review.csv', ('id', 'title_id', 'author', 'score'),
+        (('author', 'users.csv'), ('title_id', 'titles.csv')),
+        (check_score, check_unique_review)
+    ),
+    (
+        'comments.csv', ('id', 'review_id', 'author'),
+        (('author', 'users.csv'), ('review_id', 'review.csv')), ()
+    ),
+)
+
+
+def validate_files(data_path):
+    """
+    Проверяет CSV-файлы импорта целыми столбцами, не обращаясь к базе.
+
+    Ссылки проверяются по id из других файлов; строки с ошибками
+    в эти id не входят, так как импорт их пропустит. Возвращает
+    список (файл, номер строки данных, сообщение); номер 0 — ошибка
+    файла целиком.
+    """
+    known_ids = {}
+    errors = []
+    for filename, names, references, checks in CHECKED_FILES:
+        file_errors = []
+        try:
+            columns = read_columns(
+                data_file_path(data_path, filename), names
+            )
+        except (OSError, ValueError) as error:
+            errors.append((filename, 0, str(error)))
+            known_ids[filename] = set()
+            continue
+        for name in names:
+            columns[name], invalid = to_ints(columns[name])
+            file_errors.extend(
+                (index, f'{name}: не целое число') for index in invalid
+            )
+        skip = {index for index, _ in file_errors}
+        for column, target in references:
+            ids = known_ids[target]
+            file_errors.extend(
+                (index, f'{column}: нет объекта с id {value} в {target}')
+                for index, value in enumerate(columns[column])
+                if value not in ids and index not in skip
+            )
+        for check in checks:
+            file_errors.extend(
+                error for error in check(columns) if error[0] not in skip
+            )
+        if 'id' in columns:
+            failed = {index for index, _ in file_errors}
+            known_ids[filename] = {
+                value for index, value in enumerate(columns['id'])
+                if index not in failed
+            }
+        errors.extend(
+            (filename, index + 1, message)
+            for index, message in sorted(file_errors)
+        )
+    return errors
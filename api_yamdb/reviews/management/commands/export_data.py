@@ -0,0 +1,135 @@
+import csv
+import gzip
+import json
+import os
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Файл, модель и пары (столбец, поле модели) в формате import_data.
+EXPORTS = (
+    (
+        'users', User, (
+            ('id', 'id'), ('username', 'username'), ('email', 'email'),
+            ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+            ('last_name', 'last_name'),
+        )
+    ),
+    ('category', Category, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))),
+    ('genre', Genre, (('id', 'id'), ('name', 'name'), ('slug', 'slug'))),
+    (
+        'titles', Title, (
+            ('id', 'id'), ('name', 'name'), ('year', 'year'),
+            ('category', 'category_id'), ('description', 'description'),
+        )
+    ),
+    (
+        'genre_title', Title.genre.through, (
+            ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+        )
+    ),
+    (
+        'review', Review, (
+            ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+            ('author', 'author_id'), ('score', 'score'),
+            ('pub_date', 'pub_date'),
+        )
+    ),
+    (
+        'comments', Comment, (
+            ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+            ('author', 'author_id'), ('pub_date', 'created'),
+        )
+    ),
+)
+
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_csv(f, columns, rows):
+    """Пишет строки в CSV и возвращает их количество."""
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for count, row in enumerate(rows, 1):
+        writer.writerow(
+            '' if value is None else export_value(value) for value in row
+        )
+    return count
+
+
+def write_ndjson(f, columns, rows):
+    """Пишет строки по одному JSON-объекту и возвращает их количество."""
+    count = 0
+    for count, row in enumerate(rows, 1):
+        f.write(json.dumps(
+            dict(zip(columns, map(export_value, row))), ensure_ascii=False
+        ))
+        f.write('\n')
+    return count
+
+
+WRITERS = {'csv': write_csv, 'ndjson': write_ndjson}
+
+
+class Command(BaseCommand):
+    help = 'Выгружает данные в CSV-файлы в формате import_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-path',
+            default='export',
+            help='Каталог для выгружаемых файлов'
+        )
+        parser.add_argument(
+            '--format',
+            choices=tuple(WRITERS),
+            default='csv',
+            help='Формат файлов: csv (читает import_data) или ndjson'
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за один раз'
+        )
+
+    def handle(self, *args, **options):
+        output_path = options['output_path']
+        extension = options['format']
+        write = WRITERS[extension]
+        open_file = open
+        if options['gzip']:
+            open_file = gzip.open
+            extension += '.gz'
+        os.makedirs(output_path, exist_ok=True)
+
+        # Одна транзакция — согласованный снимок всех таблиц.
+        with transaction.atomic():
+            for name, model, mapping in EXPORTS:
+                columns = [column for column, _ in mapping]
+                rows = model.objects.order_by('id').values_list(
+                    *(field for _, field in mapping)
+                ).iterator(chunk_size=options['chunk_size'])
+                file_path = os.path.join(output_path, f'{name}.{extension}')
+                with open_file(
+                    file_path, 'wt', encoding='utf-8', newline=''
+                ) as f:
+                    count = write(f, columns, rows)
+                self.stdout.write(f'{file_path}: {count} строк')
+
+        self.stdout.write(self.style.SUCCESS('Данные успешно выгружены!'))
@@ -0,0 +1,150 @@
+import argparse
+import time
+from contextlib import ExitStack
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from reviews.importing import (
+    BULK_LOAD_PRAGMAS, drop_secondary_indexes, execute_statements,
+    set_pragmas
+)
+from reviews.signals import catalogue_changed
+from reviews.synthetic import (
+    DEFAULT_BATCH_SIZE, DEFAULT_USERNAME_PREFIX, GENERATED_MODELS,
+    SCORE_WEIGHTS, ZIPF_EXPONENT, SyntheticDataGenerator, SyntheticScale
+)
+
+
+def score_weights(value):
+    try:
+        return tuple(float(weight) for weight in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'Веса оценок перечисляются через запятую, например 1,1,2,3.'
+        )
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу синтетическими данными заданного размера'
+
+    def add_arguments(self, parser):
+        for name, default in zip(
+            SyntheticScale._fields, (10000, 10, 30, 10000, 200000, 50000)
+        ):
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=f'Количество создаваемых записей (по умолчанию {default})'
+            )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Размер пакета: пользователей, произведений или комментариев'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Зерно генератора случайных чисел для повторяемых данных'
+        )
+        parser.add_argument(
+            '--zipf-exponent',
+            type=float,
+            default=ZIPF_EXPONENT,
+            help=(
+                'Показатель закона Ципфа для числа отзывов на произведение: '
+                'чем больше, тем сильнее перекос в пользу популярных'
+            )
+        )
+        parser.add_argument(
+            '--score-weights',
+            type=score_weights,
+            default=SCORE_WEIGHTS,
+            help='Относительные частоты оценок от 1 до 10 через запятую'
+        )
+        parser.add_argument(
+            '--username-prefix',
+            default=DEFAULT_USERNAME_PREFIX,
+            help='Префикс имён пользователей; к нему добавляется id'
+        )
+        parser.add_argument(
+            '--no-search-index',
+            action='store_true',
+            help=(
+                'Не индексировать произведения для поиска (быстрее); '
+                'индекс строит rebuild_search_index'
+            )
+        )
+        parser.add_argument(
+            '--defer-indexes',
+            action='store_true',
+            help=(
+                'SQLite: удалить неуникальные индексы на время генерации '
+                'и перестроить их после (быстрее для больших объёмов)'
+            )
+        )
+
+    def handle(self, *args, **options):
+        scale = SyntheticScale(*(
+            options[name] for name in SyntheticScale._fields
+        ))
+        try:
+            generator = SyntheticDataGenerator(
+                scale,
+                batch_size=options['batch_size'],
+                seed=options['seed'],
+                zipf_exponent=options['zipf_exponent'],
+                score_weights=options['score_weights'],
+                username_prefix=options['username_prefix'],
+                index_search=not options['no_search_index'],
+                progress=self.progress
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            if connection.vendor == 'sqlite':
+                pragmas = set_pragmas(BULK_LOAD_PRAGMAS)
+                stack.callback(set_pragmas, pragmas)
+                if options['defer_indexes']:
+                    indexes = drop_secondary_indexes(
+                        model._meta.db_table for model in GENERATED_MODELS
+                    )
+                    stack.callback(self.rebuild_indexes, indexes)
+            try:
+                created = generator.generate()
+            except ValidationError as error:
+                raise CommandError(
+                    f'Сгенерированные данные не проходят проверку: '
+                    f'{"; ".join(error.messages)}'
+                )
+            except ValueError as error:
+                raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        catalogue_changed.send(sender=self.__class__)
+
+        rows = sum(created)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано записей: {rows} за {elapsed:.1f} с '
+            f'({rows / elapsed if elapsed else rows:.0f} в секунду).'
+        ))
+        if options['no_search_index']:
+            self.stdout.write(
+                'Поисковый индекс не обновлялся: выполните '
+                'rebuild_search_index.'
+            )
+
+    def progress(self, label, count):
+        self.stdout.write(f'  создано {label}: {count}')
+
+    def rebuild_indexes(self, indexes):
+        started = time.perf_counter()
+        execute_statements(indexes)
+        execute_statements(['ANALYZE'])
+        self.stdout.write(
+            f'  индексы перестроены за {time.perf_counter() - started:.1f} с'
+        )
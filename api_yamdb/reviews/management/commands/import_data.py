@@ -1,131 +1,248 @@
 import csv
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 
-from django.core.management.base import BaseCommand
+import django
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-from django.db import transaction
-
-from reviews.models import Category, Comment, Genre, Review, Title, User
-
-
-def import_users(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            User.objects.get_or_create(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio'] or '',
-                first_name=row['first_name'] or '',
-                last_name=row['last_name'] or ''
-            )
-
+from django.db import connection
 
-def import_categories(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            Category.objects.get_or_create(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
+from reviews.importing import (
+    BULK_LOAD_PRAGMAS, DEFAULT_BATCH_SIZE, IMPORTS, MAX_REPORTED_ERRORS,
+    Checkpoints, RatedTitles, data_file_path, drop_secondary_indexes,
+    execute_statements, file_digest, import_rows, make_writer, set_pragmas,
+    validate_files
+)
+from reviews.models import (
+    Category, Comment, Genre, ImportCheckpoint, Review, Title,
+    TitleSearchTerm, TitleTrigram, User
+)
+from reviews.signals import catalogue_changed
 
+# Таблицы, которые импорт заполняет сам или через индексацию поиска.
+FRESH_MODELS = (
+    User, Category, Genre, Title, Title.genre.through, Review, Comment,
+    TitleSearchTerm, TitleTrigram,
+)
 
-def import_genres(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            Genre.objects.get_or_create(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
 
+def check_fresh_database():
+    """Режим --fresh допустим только для SQLite и пустых таблиц."""
+    if connection.vendor != 'sqlite':
+        raise CommandError('Режим --fresh поддерживается только для SQLite.')
+    filled = [
+        model._meta.db_table for model in FRESH_MODELS
+        if model.objects.exists()
+    ]
+    if filled:
+        raise CommandError(
+            'Режим --fresh требует пустых таблиц, а данные есть в: '
+            f'{", ".join(filled)}. Запустите импорт без --fresh.'
+        )
 
-def import_titles(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            category = Category.objects.get(id=row['category'])
-            Title.objects.get_or_create(
-                id=row['id'],
-                name=row['name'],
-                year=row['year'],
-                category=category
-            )
 
+class Command(BaseCommand):
+    help = 'Импортирует данные из CSV-файлов в базу данных'
 
-def import_reviews(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            author = User.objects.get(id=row['author'])
-            title = Title.objects.get(id=row['title_id'])
-            Review.objects.get_or_create(
-                id=row['id'],
-                title=title,
-                text=row['text'],
-                author=author,
-                score=row['score'],
-                pub_date=row['pub_date']
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном bulk_create'
+        )
+        parser.add_argument(
+            '--data-path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов для разбора и проверки CSV; '
+                'в базу всегда пишет один процесс'
             )
-
-
-def import_comments(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            author = User.objects.get(id=row['author'])
-            review = Review.objects.get(id=row['review_id'])
-            Comment.objects.get_or_create(
-                id=row['id'],
-                review=review,
-                text=row['text'],
-                author=author,
-                created=row['pub_date']
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Игнорировать контрольные точки и импортировать всё заново'
+        )
+        parser.add_argument(
+            '--validate-only',
+            action='store_true',
+            help='Только проверить CSV-файлы и вывести ошибочные строки'
+        )
+        parser.add_argument(
+            '--report',
+            help='CSV-файл для полного отчёта об ошибках --validate-only'
+        )
+        parser.add_argument(
+            '--fresh',
+            action='store_true',
+            help=(
+                'Быстрая загрузка в пустую базу SQLite: индексы '
+                'перестраиваются, а внешние ключи проверяются после загрузки'
             )
+        )
 
+    @contextmanager
+    def phase(self, name):
+        self.stdout.write(f'{name}...')
+        started = time.perf_counter()
+        yield
+        self.stdout.write(
+            f'{name}: {time.perf_counter() - started:.2f} с'
+        )
 
-def import_genre_title(file_path):
-    with open(file_path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            title = Title.objects.get(id=row['title_id'])
-            genre = Genre.objects.get(id=row['genre_id'])
-            title.genre.add(genre)
+    def progress(self, processed, skipped):
+        message = f'  обработано строк: {processed}'
+        if skipped:
+            message += f', пропущено: {skipped}'
+        self.stdout.write(message)
 
+    def report(self, result):
+        if result.unchanged:
+            self.stdout.write(
+                f'  пропущено неизменённых пакетов: {result.unchanged}'
+            )
+        errors = result.errors
+        for line, message in errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(self.style.WARNING(
+                f'  строка {line}: {message}'
+            ))
+        if len(errors) > MAX_REPORTED_ERRORS:
+            self.stderr.write(self.style.WARNING(
+                f'  ... и ещё {len(errors) - MAX_REPORTED_ERRORS} ошибок'
+            ))
+        dangling = result.skipped - len(errors)
+        if dangling:
+            self.stderr.write(self.style.WARNING(
+                'Пропущено строк со ссылками на '
+                f'несуществующие объекты: {dangling}'
+            ))
 
-class Command(BaseCommand):
-    help = 'Импортирует данные из CSV-файлов в базу данных'
+    def load(self, executor, options, update=True):
+        workers = options['workers']
+        for label, filename, model, parse, references, after_batch in IMPORTS:
+            if model is Review:
+                after_batch = self.rated_titles
+            file_path = data_file_path(options['data_path'], filename)
+            checkpoints = Checkpoints(filename, enabled=not options['force'])
+            if checkpoints.file_unchanged(file_digest(file_path)):
+                self.stdout.write(
+                    f'Импорт {label}: файл не изменился, пропуск.'
+                )
+                continue
+            self.stdout.write(f'Импорт {label}...')
+            result = import_rows(
+                file_path,
+                model,
+                parse,
+                make_writer(model, references, update=update),
+                options['batch_size'],
+                checkpoints,
+                executor=executor,
+                window=workers * 2,
+                progress=self.progress,
+                after_batch=after_batch
+            )
+            self.report(result)
 
-    def handle(self, *args, **options):
-        data_path = os.path.join(settings.BASE_DIR, 'static', 'data')
+    def update_ratings(self):
+        """
+        Пересчитывает рейтинги произведений, отзывы которых записаны.
+        Если review.csv не изменился, этап пропускается.
+        """
+        if not self.rated_titles.ids:
+            return
+        with self.phase('Пересчёт рейтингов'):
+            updated = self.rated_titles.update_ratings()
+        self.stdout.write(f'  пересчитано рейтингов: {updated}')
 
+    def load_fresh(self, executor, options):
+        """
+        Загрузка в пустую базу: неуникальные индексы удаляются,
+        проверка внешних ключей и надёжность записи на диск отключаются.
+        После загрузки индексы пересоздаются, внешние ключи проверяются
+        одним проходом, а статистика планировщика обновляется ANALYZE.
+        """
+        tables = [model._meta.db_table for model in FRESH_MODELS]
+        with self.phase('Подготовка'):
+            ImportCheckpoint.objects.all().delete()
+            pragmas = set_pragmas(BULK_LOAD_PRAGMAS)
+            connection.disable_constraint_checking()
+            indexes = drop_secondary_indexes(tables)
         try:
-            with transaction.atomic():
-                self.stdout.write('Импорт пользователей...')
-                import_users(os.path.join(data_path, 'users.csv'))
-
-                self.stdout.write('Импорт категорий...')
-                import_categories(os.path.join(data_path, 'category.csv'))
-
-                self.stdout.write('Импорт жанров...')
-                import_genres(os.path.join(data_path, 'genre.csv'))
+            try:
+                with self.phase('Загрузка'):
+                    self.load(executor, options, update=False)
+            finally:
+                with self.phase('Перестроение индексов'):
+                    execute_statements(indexes)
+                connection.enable_constraint_checking()
+                self.update_ratings()
+            with self.phase('Проверка внешних ключей'):
+                connection.check_constraints(table_names=tables)
+            with self.phase('ANALYZE'):
+                execute_statements(['ANALYZE'])
+        finally:
+            set_pragmas(pragmas)
 
-                self.stdout.write('Импорт произведений...')
-                import_titles(os.path.join(data_path, 'titles.csv'))
+    def validate(self, options):
+        """Проверяет файлы без записи в базу; при ошибках — CommandError."""
+        with self.phase('Проверка'):
+            errors = validate_files(options['data_path'])
+        if options['report']:
+            with open(
+                options['report'], 'w', encoding='utf-8', newline=''
+            ) as f:
+                writer = csv.writer(f)
+                writer.writerow(('file', 'line', 'message'))
+                writer.writerows(errors)
+        for filename, line, message in errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(self.style.WARNING(
+                f'  {filename}, строка {line}: {message}'
+            ))
+        if len(errors) > MAX_REPORTED_ERRORS:
+            self.stderr.write(self.style.WARNING(
+                f'  ... и ещё {len(errors) - MAX_REPORTED_ERRORS} ошибок'
+            ))
+        if errors:
+            raise CommandError(f'Найдено ошибок: {len(errors)}.')
+        self.stdout.write(self.style.SUCCESS('Ошибок не найдено.'))
 
-                self.stdout.write('Импорт связей жанров...')
-                import_genre_title(os.path.join(data_path, 'genre_title.csv'))
-
-                self.stdout.write('Импорт отзывов...')
-                import_reviews(os.path.join(data_path, 'review.csv'))
+    def handle(self, *args, **options):
+        if options['validate_only']:
+            self.validate(options)
+            return
+        if options['fresh']:
+            check_fresh_database()
 
-                self.stdout.write('Импорт комментариев...')
-                import_comments(os.path.join(data_path, 'comments.csv'))
+        workers = options['workers']
+        self.rated_titles = RatedTitles()
+        pool = nullcontext()
+        if workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=django.setup
+            )
+        try:
+            with pool as executor:
+                if options['fresh']:
+                    self.load_fresh(executor, options)
+                else:
+                    # Пакеты, записанные до ошибки, уже отмечены
+                    # контрольными точками: их рейтинги пересчитываются
+                    # сейчас, повторный запуск их пропустит.
+                    try:
+                        with self.phase('Загрузка'):
+                            self.load(executor, options)
+                    finally:
+                        self.update_ratings()
 
             self.stdout.write(
                 self.style.SUCCESS('Все данные успешно импортированы!')
@@ -133,3 +250,9 @@ class Command(BaseCommand):
 
         except Exception as e:
             self.stderr.write(self.style.ERROR(f'Ошибка при импорте: {e}'))
+            self.stderr.write(
+                'Записанные пакеты сохранены; повторный запуск продолжит '
+                'импорт с места ошибки.'
+            )
+        finally:
+            catalogue_changed.send(sender=self.__class__)
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from reviews.fields import backfill_normalized_fields
+from reviews.models import Category, Genre, Title
+
+
+class Command(BaseCommand):
+    help = 'Заполняет нормализованные поля для поиска без учёта регистра'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одном UPDATE'
+        )
+
+    def handle(self, *args, **options):
+        for model in (Title, Genre, Category, get_user_model()):
+            count = backfill_normalized_fields(
+                model, batch_size=options['batch_size']
+            )
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {count}'
+            )
+        self.stdout.write(self.style.SUCCESS('Поля для поиска заполнены.'))
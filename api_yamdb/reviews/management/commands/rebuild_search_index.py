@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.search import TrigramTitleIndex, get_title_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс произведений'
+
+    def handle(self, *args, **options):
+        backend = get_title_search_backend()
+        with transaction.atomic():
+            backend.rebuild()
+            TrigramTitleIndex().rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Поисковый индекс перестроен ({type(backend).__name__}).'
+        ))
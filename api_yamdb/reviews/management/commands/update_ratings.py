@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.signals import catalogue_changed
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги и количество отзывов'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.all().update_rating()
+        catalogue_changed.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны: {updated} произведений.'
+        ))
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:37
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Round
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(
+        rating=Subquery(
+            reviews.annotate(value=Round(Avg('score'))).values('value')
+        ),
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value')),
+            0
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='score',
+            field=models.PositiveSmallIntegerField(help_text='Оцените от 1до 10', validators=[django.core.validators.MinValueValidator(1, message='Оценка слишком низкая!'), django.core.validators.MaxValueValidator(10, message='Оценка слишком высокая!')], verbose_name='Оценка'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:46
+
+from django.db import migrations
+import reviews.fields
+
+
+def fill_normalized_fields(apps, schema_editor):
+    for model_name in ('Title', 'Genre', 'Category'):
+        reviews.fields.backfill_normalized_fields(
+            apps.get_model('reviews', model_name)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_normalized',
+            field=reviews.fields.NormalizedCharField(blank=True, db_index=True, default='', editable=False, max_length=256, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_normalized',
+            field=reviews.fields.NormalizedCharField(blank=True, db_index=True, default='', editable=False, max_length=256, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_normalized',
+            field=reviews.fields.NormalizedCharField(blank=True, db_index=True, default='', editable=False, max_length=256, source='name', verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(
+            fill_normalized_fields, migrations.RunPython.noop
+        ),
+    ]
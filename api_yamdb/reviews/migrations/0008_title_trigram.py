@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+
+
+def fill_trigrams(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleTrigram = apps.get_model('reviews', 'TitleTrigram')
+    rows = []
+    for title in Title.objects.only('name').iterator():
+        title_trigrams = reviews.search.trigrams(title.name)
+        rows.extend(
+            TitleTrigram(
+                title_id=title.pk, trigram=trigram, total=len(title_trigrams)
+            )
+            for trigram in title_trigrams
+        )
+        if len(rows) >= 1000:
+            TitleTrigram.objects.bulk_create(rows)
+            rows = []
+    TitleTrigram.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_normalized_search_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+                ('total', models.PositiveSmallIntegerField(verbose_name='Всего триграмм в названии')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='reviews.title')),
+            ],
+            options={
+                'verbose_name': 'Триграмма названия',
+                'verbose_name_plural': 'Триграммы названий',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titletrigram',
+            index=models.Index(fields=['trigram', 'title'], name='title_trigram_idx'),
+        ),
+        migrations.RunPython(fill_trigrams, migrations.RunPython.noop),
+    ]
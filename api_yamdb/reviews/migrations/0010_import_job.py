@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reviews', '0009_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('users', 'Пользователи'), ('category', 'Категории'), ('genre', 'Жанры'), ('titles', 'Произведения'), ('genre_title', 'Жанры произведений'), ('review', 'Отзывы'), ('comments', 'Комментарии')], max_length=256, verbose_name='Тип данных')),
+                ('file_path', models.CharField(max_length=256, verbose_name='Файл')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('running', 'Выполняется'), ('done', 'Завершён'), ('failed', 'Ошибка')], default='pending', max_length=256, verbose_name='Статус')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Записано строк')),
+                ('skipped', models.PositiveIntegerField(default=0, verbose_name='Пропущено строк')),
+                ('errors', models.JSONField(default=list, verbose_name='Ошибки строк')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Количество ошибок')),
+                ('message', models.TextField(blank=True, verbose_name='Сообщение об ошибке')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Загрузка CSV',
+                'verbose_name_plural': 'Загрузки CSV',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
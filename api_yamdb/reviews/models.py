@@ -1,13 +1,44 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Round
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 from reviews import constants
+from .fields import NormalizedCharField
 from .validators import validate_year
 
 User = get_user_model()
 
 
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с пересчётом сохранённого рейтинга."""
+
+    def update_rating(self):
+        """
+        Пересчитывает рейтинг и количество отзывов одним UPDATE.
+
+        Агрегаты считаются коррелированными подзапросами только по отзывам
+        обновляемых произведений, поэтому стоимость не зависит от размера
+        всей таблицы отзывов. Рейтинг входит в ответ API, поэтому
+        обновляется и дата изменения произведения.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating=Subquery(
+                reviews.annotate(value=Round(Avg('score'))).values('value')
+            ),
+            reviews_count=Coalesce(
+                Subquery(reviews.annotate(value=Count('pk')).values('value')),
+                0
+            ),
+            updated_at=timezone.now()
+        )
+
+
 class Title(models.Model):
     """Модель произведения (фильм, книга и т.д.)."""
 
@@ -16,6 +47,11 @@ class Title(models.Model):
         max_length=constants.MAX_LENGTH,
         db_index=True
     )
+    name_normalized = NormalizedCharField(
+        'Название для поиска',
+        max_length=constants.MAX_LENGTH,
+        source='name'
+    )
     year = models.SmallIntegerField(
         'Год выпуска',
         validators=(validate_year,),
@@ -37,11 +73,36 @@ class Title(models.Model):
         on_delete=models.PROTECT,
         related_name='titles'
     )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year', 'name')
+        indexes = (
+            models.Index(
+                fields=('-year', 'name', 'id'),
+                name='title_year_name_idx'
+            ),
+        )
 
     def __str__(self):
         return f'Произведение: "{self.name}" (год: {self.year})'
@@ -54,6 +115,11 @@ class Genre(models.Model):
         'Название',
         max_length=constants.MAX_LENGTH
     )
+    name_normalized = NormalizedCharField(
+        'Название для поиска',
+        max_length=constants.MAX_LENGTH,
+        source='name'
+    )
     slug = models.SlugField(
         'Идентификатор (slug)',
         unique=True
@@ -75,6 +141,11 @@ class Category(models.Model):
         'Название',
         max_length=constants.MAX_LENGTH
     )
+    name_normalized = NormalizedCharField(
+        'Название для поиска',
+        max_length=constants.MAX_LENGTH,
+        source='name'
+    )
     slug = models.SlugField(
         'Идентификатор (slug)',
         unique=True
@@ -123,6 +194,7 @@ class Review(models.Model):
         ]
     )
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         constraints = (
@@ -131,6 +203,16 @@ class Review(models.Model):
                 name='unique_review'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('title', 'updated_at'),
+                name='review_title_updated_idx'
+            ),
+        )
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         ordering = ('-pub_date',)
@@ -138,6 +220,26 @@ class Review(models.Model):
     def __str__(self):
         return f'Отзыв: {self.name}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет отзыв и в той же транзакции обновляет рейтинг.
+
+        Если отзыв перенесён к другому произведению (например, в админке),
+        пересчитывается и рейтинг прежнего произведения.
+        """
+        title_ids = {self.title_id, getattr(self, '_loaded_title_id', None)}
+        title_ids.discard(None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Title.objects.filter(pk__in=title_ids).update_rating()
+        self._loaded_title_id = self.title_id
+
 
 class Comment(models.Model):
     """Модель комментариев произведения."""
@@ -158,11 +260,195 @@ class Comment(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('review', 'created'),
+                name='comment_review_created_idx'
+            ),
+            models.Index(
+                fields=('review', 'updated_at'),
+                name='comment_review_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return f'Комментарий: {self.name}'
+
+
+class TitleSearchTerm(models.Model):
+    """
+    Слово поискового индекса произведений.
+
+    Используется переносимым бэкендом поиска, когда FTS5 недоступен
+    (см. reviews.search).
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    term = models.CharField(
+        'Слово',
+        max_length=constants.MAX_SEARCH_TERM_LENGTH
+    )
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        indexes = (
+            models.Index(
+                fields=('term', 'title'),
+                name='title_search_term_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Слово: {self.term}'
+
+
+class TitleTrigram(models.Model):
+    """Триграмма названия произведения для нечёткого поиска."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='trigrams'
+    )
+    trigram = models.CharField('Триграмма', max_length=3)
+    total = models.PositiveSmallIntegerField('Всего триграмм в названии')
+
+    class Meta:
+        verbose_name = 'Триграмма названия'
+        verbose_name_plural = 'Триграммы названий'
+        indexes = (
+            models.Index(
+                fields=('trigram', 'title'),
+                name='title_trigram_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Триграмма: {self.trigram}'
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Контрольная точка импорта CSV (команда import_data).
+
+    Хранит хеш содержимого файла целиком (chunk = None) или отдельного
+    пакета строк, чтобы повторный импорт пропускал неизменённые данные.
+    """
+
+    source = models.CharField('Файл', max_length=constants.MAX_LENGTH)
+    chunk = models.PositiveIntegerField(
+        'Номер пакета',
+        blank=True,
+        null=True
+    )
+    digest = models.CharField('Хеш содержимого', max_length=64)
+    updated = models.DateTimeField('Дата обновления', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка импорта'
+        verbose_name_plural = 'Контрольные точки импорта'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('source', 'chunk'),
+                name='unique_import_checkpoint'
+            ),
+        )
+
+    def __str__(self):
+        return f'Импорт {self.source}: пакет {self.chunk}'
+
+
+class ImportJob(models.Model):
+    """
+    Загрузка CSV одного типа данных через API.
+
+    Файл сохраняется на диск, а импорт выполняется в фоне; ход работы
+    и ошибки строк читаются из этой записи.
+    """
+
+    class EntityChoices(models.TextChoices):
+        USERS = 'users', 'Пользователи'
+        CATEGORY = 'category', 'Категории'
+        GENRE = 'genre', 'Жанры'
+        TITLES = 'titles', 'Произведения'
+        GENRE_TITLE = 'genre_title', 'Жанры произведений'
+        REVIEW = 'review', 'Отзывы'
+        COMMENTS = 'comments', 'Комментарии'
+
+    class StatusChoices(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Завершён'
+        FAILED = 'failed', 'Ошибка'
+
+    entity = models.CharField(
+        'Тип данных',
+        max_length=constants.MAX_LENGTH,
+        choices=EntityChoices.choices
+    )
+    file_path = models.CharField('Файл', max_length=constants.MAX_LENGTH)
+    status = models.CharField(
+        'Статус',
+        max_length=constants.MAX_LENGTH,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING
+    )
+    processed = models.PositiveIntegerField('Записано строк', default=0)
+    skipped = models.PositiveIntegerField('Пропущено строк', default=0)
+    errors = models.JSONField('Ошибки строк', default=list)
+    error_count = models.PositiveIntegerField('Количество ошибок', default=0)
+    message = models.TextField('Сообщение об ошибке', blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='import_jobs',
+        verbose_name='Автор'
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    finished = models.DateTimeField('Дата завершения', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Загрузка CSV'
+        verbose_name_plural = 'Загрузки CSV'
+        ordering = ('-created',)
+
+    def __str__(self):
+        return f'{self.get_entity_display()}: {self.get_status_display()}'
+
+
+class CatalogueVersion(models.Model):
+    """
+    Версия раздела каталога (произведения, жанры, категории).
+
+    Меняется при любой записи в раздел, включая массовую запись
+    командами управления. Служит версией ключей кэша ответов и списка
+    произведений; хранится в БД, чтобы все процессы сервера и команды
+    видели одно значение.
+    """
+
+    namespace = models.CharField(
+        'Раздел',
+        max_length=constants.MAX_LENGTH,
+        unique=True
+    )
+    version = models.BigIntegerField('Версия')
+
+    class Meta:
+        verbose_name = 'Версия раздела каталога'
+        verbose_name_plural = 'Версии разделов каталога'
+
+    def __str__(self):
+        return f'{self.namespace}: {self.version}'
@@ -0,0 +1,271 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.db import connection, models
+from django.db.models import Case, Count, FloatField, IntegerField, Max
+from django.db.models import OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+from .constants import MAX_SEARCH_TERM_LENGTH
+
+FTS_TABLE = 'reviews_title_fts'
+NAME_WEIGHT = 10
+DESCRIPTION_WEIGHT = 1
+FUZZY_SIMILARITY_THRESHOLD = 0.3
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре (с учётом кириллицы)."""
+    return [
+        token[:MAX_SEARCH_TERM_LENGTH]
+        for token in TOKEN_RE.findall((text or '').casefold())
+    ]
+
+
+def trigrams(text):
+    """
+    Множество триграмм слов текста, как в pg_trgm: каждое слово
+    дополняется двумя пробелами слева и одним справа.
+    """
+    result = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        result.update(
+            padded[index:index + 3] for index in range(len(padded) - 2)
+        )
+    return result
+
+
+def title_terms(title):
+    """Возвращает веса слов произведения: название весомее описания."""
+    terms = Counter()
+    for token in tokenize(title.name):
+        terms[token] += NAME_WEIGHT
+    for token in tokenize(title.description):
+        terms[token] += DESCRIPTION_WEIGHT
+    return terms
+
+
+class FTS5TitleSearchBackend:
+    """Поиск через виртуальную таблицу SQLite FTS5 с ранжированием bm25."""
+
+    def index(self, titles):
+        rows = [
+            (title.pk, title.name, title.description or '')
+            for title in titles
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(row[0],) for row in rows]
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                'VALUES (%s, %s, %s)',
+                rows
+            )
+
+    def remove(self, title_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(title_id,) for title_id in title_ids]
+            )
+
+    def rebuild(self, chunk_size=None):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                "SELECT id, name, COALESCE(description, '') "
+                'FROM reviews_title'
+            )
+
+    def filter(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        table = queryset.model._meta.db_table
+        # Ранг — аннотация, а не extra(select): по нему можно фильтровать,
+        # поэтому режим курсора продолжает выдачу с позиции ранга.
+        return queryset.extra(
+            tables=(FTS_TABLE,),
+            where=(
+                f'{FTS_TABLE}.rowid = {table}.id',
+                f'{FTS_TABLE} MATCH %s',
+            ),
+            params=(match,),
+        ).annotate(
+            search_rank=RawSQL(
+                f'bm25({FTS_TABLE}, {NAME_WEIGHT}.0, '
+                f'{DESCRIPTION_WEIGHT}.0)',
+                (),
+                output_field=FloatField()
+            )
+        ).order_by('search_rank')
+
+
+class TermIndexTitleSearchBackend:
+    """
+    Переносимый запасной вариант: инвертированный индекс в таблице
+    TitleSearchTerm, который строится на Python.
+    """
+
+    @property
+    def model(self):
+        from .models import TitleSearchTerm
+        return TitleSearchTerm
+
+    def index(self, titles):
+        titles = list(titles)
+        self.remove(title.pk for title in titles)
+        self.model.objects.bulk_create(
+            (
+                self.model(title_id=title.pk, term=term, weight=weight)
+                for title in titles
+                for term, weight in title_terms(title).items()
+            ),
+            batch_size=1000
+        )
+
+    def remove(self, title_ids):
+        self.model.objects.filter(title_id__in=list(title_ids)).delete()
+
+    def rebuild(self, chunk_size=1000):
+        from .models import Title
+
+        self.model.objects.all().delete()
+        titles = Title.objects.only('name', 'description').iterator(
+            chunk_size=chunk_size
+        )
+        chunk = []
+        for title in titles:
+            chunk.append(title)
+            if len(chunk) == chunk_size:
+                self.index(chunk)
+                chunk = []
+        self.index(chunk)
+
+    def filter(self, queryset, query):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return queryset
+        terms = self.model.objects.filter(
+            Q(
+                *(Q(term__startswith=token) for token in tokens),
+                _connector=Q.OR
+            )
+        ).values('title')
+        matched = terms.annotate(
+            score=Sum('weight'),
+            **{
+                f'token_{index}': Max(Case(
+                    When(term__startswith=token, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField()
+                ))
+                for index, token in enumerate(tokens)
+            }
+        ).filter(**{
+            f'token_{index}': 1 for index in range(len(tokens))
+        })
+        return queryset.filter(
+            pk__in=matched.values('title')
+        ).annotate(
+            search_rank=-Subquery(
+                matched.filter(title=OuterRef('pk')).values('score'),
+                output_field=models.IntegerField()
+            )
+        ).order_by('search_rank')
+
+
+class TrigramTitleIndex:
+    """
+    Нечёткий поиск по названию через таблицу триграмм TitleTrigram.
+
+    Кандидаты выбираются по индексу (trigram, title) — только произведения
+    с общими триграммами, без сравнения запроса с каждой строкой.
+    Сходство считается как в pg_trgm: общие / (все в запросе + все
+    в названии - общие).
+    """
+
+    threshold = FUZZY_SIMILARITY_THRESHOLD
+
+    @property
+    def model(self):
+        from .models import TitleTrigram
+        return TitleTrigram
+
+    def index(self, titles):
+        titles = list(titles)
+        self.remove(title.pk for title in titles)
+        rows = []
+        for title in titles:
+            title_trigrams = trigrams(title.name)
+            rows.extend(
+                self.model(
+                    title_id=title.pk,
+                    trigram=trigram,
+                    total=len(title_trigrams)
+                )
+                for trigram in title_trigrams
+            )
+        self.model.objects.bulk_create(rows, batch_size=1000)
+
+    def remove(self, title_ids):
+        self.model.objects.filter(title_id__in=list(title_ids)).delete()
+
+    def rebuild(self, chunk_size=1000):
+        from .models import Title
+
+        self.model.objects.all().delete()
+        chunk = []
+        for title in Title.objects.only('name').iterator(
+            chunk_size=chunk_size
+        ):
+            chunk.append(title)
+            if len(chunk) == chunk_size:
+                self.index(chunk)
+                chunk = []
+        self.index(chunk)
+
+    def filter(self, queryset, query):
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return queryset.none()
+        shared = Cast(Count('pk'), FloatField())
+        matched = self.model.objects.filter(
+            trigram__in=query_trigrams
+        ).values('title').annotate(
+            similarity=shared / (
+                Value(float(len(query_trigrams))) + Max('total') - shared
+            )
+        ).filter(similarity__gte=self.threshold)
+        return queryset.filter(
+            pk__in=matched.values('title')
+        ).annotate(
+            search_rank=-Subquery(
+                matched.filter(title=OuterRef('pk')).values('similarity'),
+                output_field=FloatField()
+            )
+        ).order_by('search_rank')
+
+
+@lru_cache(maxsize=None)
+def fts5_available():
+    return (
+        connection.vendor == 'sqlite'
+        and FTS_TABLE in connection.introspection.table_names()
+    )
+
+
+def get_title_search_backend():
+    """FTS5 на SQLite, если таблица создана, иначе индекс на Python."""
+    if fts5_available():
+        return FTS5TitleSearchBackend()
+    return TermIndexTitleSearchBackend()
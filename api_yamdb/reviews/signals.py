@@ -0,0 +1,168 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db.models.signals import pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import Category, Comment, Genre, Review, Title, User
+from .search import TrigramTitleIndex, get_title_search_backend
+
+# Каталог изменён массово, в обход сигналов моделей (импорт, генерация
+# данных, пересчёт рейтингов): кэш ответов и версии списков устарели.
+catalogue_changed = Signal()
+
+
+class DeletionState(threading.local):
+    """
+    Удаляемые сейчас в потоке объекты, чьи каскадно удаляемые отзывы
+    и комментарии не должны обновлять родителей по одному.
+
+    titles и reviews — pk удаляемых произведений и отзывов, users —
+    {pk пользователя: (id произведений его отзывов, id отзывов его
+    комментариев)}; родители пересчитываются один раз после удаления
+    пользователя.
+    """
+
+    def __init__(self):
+        self.titles = set()
+        self.reviews = set()
+        self.users = {}
+
+
+deletion = DeletionState()
+
+
+@receiver(pre_delete, sender=Title)
+def mark_title_deleting(sender, instance, **kwargs):
+    deletion.titles.add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def unmark_title_deleting(sender, instance, **kwargs):
+    deletion.titles.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=Review)
+def mark_review_deleting(sender, instance, **kwargs):
+    deletion.reviews.add(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def collect_authored_parents(sender, instance, **kwargs):
+    deletion.users[instance.pk] = (
+        set(Review.objects.filter(author=instance).values_list(
+            'title_id', flat=True
+        )),
+        set(Comment.objects.filter(author=instance).values_list(
+            'review_id', flat=True
+        )),
+    )
+
+
+@receiver(post_delete, sender=User)
+def update_authored_parents(sender, instance, **kwargs):
+    """Обновляет родителей отзывов и комментариев удалённого автора."""
+    title_ids, review_ids = deletion.users.pop(instance.pk, ((), ()))
+    if title_ids:
+        Title.objects.filter(pk__in=title_ids).update_rating()
+    if review_ids:
+        Review.objects.filter(pk__in=review_ids).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    """
+    Пересчитывает рейтинг произведения после удаления отзыва.
+
+    Сигнал срабатывает и при каскадном удалении, и при удалении
+    через QuerySet, внутри транзакции удаления. При удалении самого
+    произведения или автора отзыва пересчёт по каждому отзыву
+    не нужен: произведение исчезает или пересчитывается один раз.
+    """
+    deletion.reviews.discard(instance.pk)
+    if (
+        instance.title_id in deletion.titles
+        or instance.author_id in deletion.users
+    ):
+        return
+    Title.objects.filter(pk=instance.title_id).update_rating()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw=False, **kwargs):
+    """Обновляет поисковый индекс после сохранения произведения."""
+    if not raw:
+        get_title_search_backend().index((instance,))
+        TrigramTitleIndex().index((instance,))
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    """Удаляет произведение из поискового индекса."""
+    get_title_search_backend().remove((instance.pk,))
+    TrigramTitleIndex().remove((instance.pk,))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_of_genre(sender, instance, raw=False, **kwargs):
+    """Жанры входят в ответ о произведении: обновляем его дату изменения."""
+    if not raw:
+        Title.objects.filter(genre=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def touch_titles_of_category(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.objects.filter(category=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_review_on_comment_change(sender, instance, raw=False, **kwargs):
+    """
+    Запись и удаление комментария меняют список комментариев отзыва;
+    дата изменения отзыва служит версией этого списка. Отзыв, который
+    удаляется сам или вместе с автором комментария, не обновляется.
+    """
+    if raw or (
+        instance.review_id in deletion.reviews
+        or instance.author_id in deletion.users
+    ):
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        updated_at=timezone.now()
+    )
+
+
+def touch_authored(author_ids):
+    """
+    Обновляет даты изменения отзывов и комментариев авторов, а также
+    их родителей: даты родителей служат версиями вложенных списков.
+    """
+    now = timezone.now()
+    Review.objects.filter(author__in=author_ids).update(updated_at=now)
+    Comment.objects.filter(author__in=author_ids).update(updated_at=now)
+    Title.objects.filter(reviews__author__in=author_ids).update(
+        updated_at=now
+    )
+    Review.objects.filter(comments__author__in=author_ids).update(
+        updated_at=now
+    )
+
+
+@receiver(pre_save, sender=User)
+def touch_authored_on_rename(sender, instance, raw=False, **kwargs):
+    """Имя автора входит в ответы об отзывах и комментариях."""
+    if raw or instance.pk is None:
+        return
+    username = sender.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    if username is not None and username != instance.username:
+        touch_authored((instance.pk,))
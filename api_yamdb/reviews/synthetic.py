@@ -0,0 +1,344 @@
+import random
+from collections import namedtuple
+from datetime import timedelta
+from itertools import accumulate, repeat
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .constants import MAX_SCORE, MIN_SCORE
+from .fields import normalize_text
+from .importing import index_titles
+from .models import (
+    Category, Comment, Genre, Review, Title, TitleSearchTerm, TitleTrigram,
+    User
+)
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_USERNAME_PREFIX = 'synthetic_'
+ZIPF_EXPONENT = 1.1
+# Частоты оценок 1..10: большинство ставит высокие оценки.
+SCORE_WEIGHTS = (2, 1, 1, 2, 4, 6, 10, 14, 12, 8)
+FIRST_YEAR = 1900
+MAX_GENRES_PER_TITLE = 3
+HISTORY_DAYS = 3 * 365
+TIMESTAMPS_POOL_SIZE = 4096
+REVIEW_TEXTS = (
+    'Смотрел на одном дыхании.',
+    'Неплохо, но слишком затянуто.',
+    'Классика, которую стоит пересматривать.',
+    'Ожидал большего от этого автора.',
+    'Сюжет предсказуем, зато актёры хороши.',
+)
+COMMENT_TEXTS = (
+    'Согласен.',
+    'Не могу согласиться с оценкой.',
+    'Спасибо, посмотрю.',
+    'А мне понравилось больше.',
+)
+
+SyntheticScale = namedtuple(
+    'SyntheticScale',
+    ('users', 'categories', 'genres', 'titles', 'reviews', 'comments')
+)
+
+# Таблицы, в которые пишет генератор (в том числе индекс поиска).
+GENERATED_MODELS = (
+    User, Category, Genre, Title, Title.genre.through, Review, Comment,
+    TitleSearchTerm, TitleTrigram,
+)
+
+
+def next_id(model):
+    return (model.objects.aggregate(value=Max('pk'))['value'] or 0) + 1
+
+
+def zipf_counts(total, size, cap, exponent=ZIPF_EXPONENT, rng=random):
+    """
+    Делит total записей между size объектами по закону Ципфа.
+
+    Объект ранга r получает долю 1 / r ** exponent, но не больше cap
+    записей (отзыв автора на произведение уникален). Ранги перемешаны,
+    чтобы популярные произведения не шли подряд по id.
+    """
+    if not size:
+        return []
+    weights = [rank ** -exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [min(cap, int(weight * scale)) for weight in weights]
+    rest = min(total, cap * size) - sum(counts)
+    index = 0
+    while rest > 0:
+        if counts[index] < cap:
+            counts[index] += 1
+            rest -= 1
+        index = (index + 1) % size
+    rng.shuffle(counts)
+    return counts
+
+
+def score_rating(total, count):
+    """Рейтинг как у TitleQuerySet.update_rating: ROUND(AVG(score))."""
+    if not count:
+        return None
+    return int(total / count + 0.5)
+
+
+def insert_columns(model, size, columns):
+    """
+    Вставляет size строк одним executemany, не создавая объектов модели.
+
+    columns — значения по attname поля: список (или range) уже
+    приведённых к виду БД значений для каждой строки либо одно значение
+    для всех строк. Остальные поля получают значение по умолчанию,
+    auto_now и auto_now_add — текущее время; первичный ключ без значения
+    назначает БД. Одиночные значения приводятся к виду БД один раз.
+    """
+    names, values = [], []
+    for field in model._meta.concrete_fields:
+        if field.attname in columns:
+            value = columns[field.attname]
+        elif field.primary_key:
+            continue
+        elif getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            value = timezone.now()
+        else:
+            value = field.get_default()
+        if not isinstance(value, (list, range)):
+            value = repeat(field.get_db_prep_save(value, connection), size)
+        names.append(connection.ops.quote_name(field.column))
+        values.append(value)
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(model._meta.db_table),
+        ', '.join(names),
+        ', '.join(['%s'] * len(names))
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, zip(*values))
+
+
+class SyntheticDataGenerator:
+    """
+    Заполняет базу синтетическими данными для замеров.
+
+    Значения генерируются целыми столбцами на пакет (random.choices
+    с k по размеру пакета вместо вызова на каждую строку) и пишутся
+    executemany без создания объектов моделей; каждый пакет — отдельная
+    транзакция. Id назначаются заранее от текущего максимума, поэтому
+    генератор дописывает данные к уже существующим. Отзывы распределяются
+    по произведениям по закону Ципфа, автор отзывается на произведение
+    не больше одного раза (unique_review), а сохранённый рейтинг
+    считается по сгенерированным оценкам.
+    """
+
+    def __init__(self, scale, batch_size=DEFAULT_BATCH_SIZE, seed=None,
+                 zipf_exponent=ZIPF_EXPONENT, score_weights=SCORE_WEIGHTS,
+                 username_prefix=DEFAULT_USERNAME_PREFIX, index_search=True,
+                 progress=None):
+        if len(score_weights) != MAX_SCORE - MIN_SCORE + 1:
+            raise ValueError(
+                f'Нужно {MAX_SCORE - MIN_SCORE + 1} весов оценок '
+                f'от {MIN_SCORE} до {MAX_SCORE}.'
+            )
+        self.scale = scale
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.zipf_exponent = zipf_exponent
+        self.score_cum_weights = list(accumulate(score_weights))
+        self.username_prefix = username_prefix
+        self.index_search = index_search
+        self.progress = progress or (lambda label, count: None)
+
+    def generate(self):
+        """
+        Создаёт данные и возвращает SyntheticScale с числом созданных
+        записей. Имена пользователей проверяются до записи в БД. Если
+        новых категорий нет, произведения получают существующие.
+        """
+        self.now = timezone.now()
+        first_user_id = next_id(User)
+        users = range(first_user_id, first_user_id + self.scale.users)
+        self.check_users(users)
+        existing_categories = []
+        if self.scale.titles and not self.scale.categories:
+            existing_categories = list(
+                Category.objects.values_list('pk', flat=True)
+            )
+            if not existing_categories:
+                raise ValueError(
+                    'Произведениям нужна категория: задайте --categories '
+                    'или создайте категории заранее.'
+                )
+        self.timestamps = self.timestamps_pool()
+        self.create_users(users)
+        categories = self.create_slugged(
+            Category, self.scale.categories, 'category', 'категорий'
+        ) or existing_categories
+        genres = self.create_slugged(
+            Genre, self.scale.genres, 'genre', 'жанров'
+        )
+        reviews = self.create_titles(users, categories, genres)
+        comments = self.create_comments(users, reviews)
+        return SyntheticScale(
+            len(users), self.scale.categories, len(genres), self.scale.titles,
+            len(reviews), comments
+        )
+
+    def username(self, pk):
+        return f'{self.username_prefix}{pk}'
+
+    def check_users(self, users):
+        """
+        Проверяет валидаторами полей username и email первое и самое
+        длинное из сгенерированных значений: остальные отличаются
+        от них только цифрами.
+        """
+        username_field = User._meta.get_field('username')
+        email_field = User._meta.get_field('email')
+        for pk in {users[0], users[-1]} if users else ():
+            username_field.run_validators(self.username(pk))
+            email_field.run_validators(f'{self.username(pk)}@yamdb.fake')
+
+    def timestamps_pool(self):
+        """Даты публикаций за HISTORY_DAYS, уже в виде для БД."""
+        seconds = HISTORY_DAYS * 24 * 60 * 60
+        return [
+            connection.ops.adapt_datetimefield_value(
+                self.now - timedelta(seconds=self.rng.randrange(seconds))
+            )
+            for _ in range(TIMESTAMPS_POOL_SIZE)
+        ]
+
+    def batches(self, start, count):
+        for offset in range(0, count, self.batch_size):
+            yield range(
+                start + offset, start + min(offset + self.batch_size, count)
+            )
+
+    def create_users(self, users):
+        for ids in self.batches(users.start, len(users)):
+            usernames = [self.username(pk) for pk in ids]
+            with transaction.atomic():
+                insert_columns(User, len(ids), {
+                    'id': ids,
+                    'username': usernames,
+                    'username_normalized': list(
+                        map(normalize_text, usernames)
+                    ),
+                    'email': [f'{name}@yamdb.fake' for name in usernames],
+                    'password': UNUSABLE_PASSWORD_PREFIX,
+                })
+            self.progress('пользователей', ids.stop - users.start)
+
+    def create_slugged(self, model, count, prefix, label):
+        first_id = next_id(model)
+        ids = range(first_id, first_id + count)
+        names = [f'{model._meta.verbose_name} {pk}' for pk in ids]
+        insert_columns(model, count, {
+            'id': ids,
+            'name': names,
+            'name_normalized': list(map(normalize_text, names)),
+            'slug': [f'synthetic-{prefix}-{pk}' for pk in ids],
+        })
+        self.progress(label, count)
+        return ids
+
+    def create_titles(self, users, categories, genres):
+        """Создаёт произведения с жанрами и отзывами; возвращает id отзывов."""
+        rng = self.rng
+        counts = zipf_counts(
+            self.scale.reviews, self.scale.titles, len(users),
+            self.zipf_exponent, rng
+        )
+        first_id = next_id(Title)
+        first_review_id = review_id = next_id(Review)
+        links = Title.genre.through
+        scores_range = range(MIN_SCORE, MAX_SCORE + 1)
+        genres_counts_range = range(
+            min(1, len(genres)), min(len(genres), MAX_GENRES_PER_TITLE) + 1
+        )
+        for ids in self.batches(first_id, self.scale.titles):
+            batch_counts = counts[ids.start - first_id:ids.stop - first_id]
+            reviews_count = sum(batch_counts)
+            scores = rng.choices(
+                scores_range, cum_weights=self.score_cum_weights,
+                k=reviews_count
+            )
+            review_titles, authors, ratings = [], [], []
+            offset = 0
+            for pk, count in zip(ids, batch_counts):
+                review_titles.extend(repeat(pk, count))
+                authors.extend(rng.sample(users, count))
+                ratings.append(score_rating(
+                    sum(scores[offset:offset + count]), count
+                ))
+                offset += count
+            link_titles, link_genres = [], []
+            for pk, count in zip(
+                ids, rng.choices(genres_counts_range, k=len(ids))
+            ):
+                link_titles.extend(repeat(pk, count))
+                link_genres.extend(rng.sample(genres, count))
+            names = [f'Произведение {pk}' for pk in ids]
+            pub_dates = rng.choices(self.timestamps, k=reviews_count)
+            with transaction.atomic():
+                insert_columns(Title, len(ids), {
+                    'id': ids,
+                    'name': names,
+                    'name_normalized': list(map(normalize_text, names)),
+                    'year': rng.choices(
+                        range(FIRST_YEAR, self.now.year + 1), k=len(ids)
+                    ),
+                    'category_id': rng.choices(categories, k=len(ids)),
+                    'description': 'Синтетическое произведение',
+                    'rating': ratings,
+                    'reviews_count': batch_counts,
+                })
+                insert_columns(links, len(link_titles), {
+                    'title_id': link_titles, 'genre_id': link_genres,
+                })
+                if self.index_search:
+                    index_titles(
+                        Title(id=pk, name=name) for pk, name in zip(ids, names)
+                    )
+                insert_columns(Review, reviews_count, {
+                    'id': range(review_id, review_id + reviews_count),
+                    'title_id': review_titles,
+                    'author_id': authors,
+                    'text': rng.choices(REVIEW_TEXTS, k=reviews_count),
+                    'score': scores,
+                    'pub_date': pub_dates,
+                    'updated_at': pub_dates,
+                })
+            review_id += reviews_count
+            self.progress('произведений', ids.stop - first_id)
+        return range(first_review_id, review_id)
+
+    def create_comments(self, users, reviews):
+        if not reviews:
+            return 0
+        rng = self.rng
+        first_id = next_id(Comment)
+        for ids in self.batches(first_id, self.scale.comments):
+            created = rng.choices(self.timestamps, k=len(ids))
+            review_ids = rng.choices(reviews, k=len(ids))
+            with transaction.atomic():
+                insert_columns(Comment, len(ids), {
+                    'id': ids,
+                    'review_id': review_ids,
+                    'author_id': rng.choices(users, k=len(ids)),
+                    'text': rng.choices(COMMENT_TEXTS, k=len(ids)),
+                    'created': created,
+                    'updated_at': created,
+                })
+                # Вставка идёт в обход сигналов: дата изменения отзыва —
+                # версия списка его комментариев.
+                Review.objects.filter(pk__in=set(review_ids)).update(
+                    updated_at=timezone.now()
+                )
+            self.progress('комментариев', ids.stop - first_id)
+        return self.scale.comments
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 17:46
+
+from django.db import migrations
+import reviews.fields
+
+
+def fill_normalized_fields(apps, schema_editor):
+    for model_name in ('CustomUser',):
+        reviews.fields.backfill_normalized_fields(
+            apps.get_model('users', model_name)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='username_normalized',
+            field=reviews.fields.NormalizedCharField(blank=True, db_index=True, default='', editable=False, max_length=150, source='username', verbose_name='Username для поиска'),
+        ),
+        migrations.RunPython(
+            fill_normalized_fields, migrations.RunPython.noop
+        ),
+    ]
@@ -1,9 +1,49 @@
-from django.contrib.auth.models import AbstractUser
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
 
+from .signals import access_changed
 from .validators import validate_username_is_allowed
 from reviews.constants import MAX_NAME_LENGTH, MAX_LENGTH
+from reviews.fields import NormalizedCharField
+
+
+ACCESS_FIELDS = ('role', 'is_superuser', 'is_active')
+
+
+class CustomUserQuerySet(models.QuerySet):
+    """QuerySet пользователей, учитывающий версию прав доступа."""
+
+    def update(self, **kwargs):
+        """
+        UPDATE в обход save() (в том числе bulk_update при импорте):
+        у строк, где меняется роль, права суперпользователя или
+        активность, версия прав увеличивается в том же запросе.
+        """
+        changed = [
+            ~Q(**{name: kwargs[name]})
+            for name in ACCESS_FIELDS if name in kwargs
+        ]
+        if not changed or 'role_version' in kwargs:
+            return super().update(**kwargs)
+        kwargs['role_version'] = Case(
+            When(reduce(or_, changed), then=F('role_version') + 1),
+            default=F('role_version')
+        )
+        with transaction.atomic(using=self.db):
+            user_ids = list(self.values_list('pk', flat=True))
+            updated = super().update(**kwargs)
+            access_changed.send(sender=self.model, user_ids=user_ids)
+        return updated
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
 
 
 class CustomUser(AbstractUser):
@@ -26,6 +66,11 @@ class CustomUser(AbstractUser):
             validate_username_is_allowed
         )
     )
+    username_normalized = NormalizedCharField(
+        verbose_name='Username для поиска',
+        max_length=MAX_NAME_LENGTH,
+        source='username'
+    )
     email = models.EmailField(
         verbose_name='email',
         unique=True
@@ -40,6 +85,13 @@ class CustomUser(AbstractUser):
         choices=RoleChoises.choices,
         default=RoleChoises.USER
     )
+    role_version = models.PositiveIntegerField(
+        verbose_name='Версия прав доступа',
+        default=0,
+        editable=False
+    )
+
+    objects = CustomUserManager()
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ('email',)
@@ -52,6 +104,32 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f'Пользователь: {self.username}, Email: {self.email}'
 
+    def get_access_state(self):
+        return self.role, self.is_superuser, self.is_active
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ACCESS_FIELDS):
+            instance._loaded_access_state = instance.get_access_state()
+        return instance
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет пользователя; при смене роли, прав суперпользователя
+        или активности увеличивает версию прав доступа. Токены с более
+        старой версией перестают считаться достаточными для проверки прав
+        без загрузки пользователя из БД.
+        """
+        loaded = getattr(self, '_loaded_access_state', None)
+        if loaded is not None and loaded != self.get_access_state():
+            self.role_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role_version'}
+        super().save(*args, **kwargs)
+        self._loaded_access_state = self.get_access_state()
+
     @property
     def is_admin(self):
         """Проверяет, является ли пользователь администратором."""
@@ -61,3 +139,60 @@ class CustomUser(AbstractUser):
     def is_moderator(self):
         """Проверяет, является ли пользователь модератором."""
         return self.role == self.RoleChoises.MODERATOR
+
+
+class OutgoingEmail(models.Model):
+    """
+    Письмо в таблице исходящих.
+
+    Сохраняется в транзакции запроса, а отправляется фоновым потоком
+    или командой send_outbox (см. users.outbox). Текст содержит код
+    подтверждения, поэтому после отправки или последней неудачной
+    попытки очищается.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = 'pending', 'Ожидает отправки'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Не отправлено'
+
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=MAX_LENGTH)
+    body = models.TextField('Текст')
+    from_email = models.CharField(
+        'Отправитель',
+        max_length=MAX_LENGTH,
+        blank=True
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=MAX_LENGTH,
+        choices=StatusChoices.choices,
+        default=StatusChoices.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки',
+        default=0
+    )
+    next_attempt = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now
+    )
+    claim = models.UUIDField('Пакет отправки', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    sent = models.DateTimeField('Дата отправки', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('pk',)
+        indexes = (
+            models.Index(
+                fields=('status', 'next_attempt'),
+                name='outgoing_email_pending_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Письмо для {self.recipient}: {self.get_status_display()}'
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+# Сколько секунд захваченный пакет недоступен другим обработчикам;
+# если обработчик упал, письма снова станут доступны после этого срока.
+CLAIM_TIMEOUT = 300
+
+
+def claim_batch(size):
+    """
+    Захватывает до size писем, которые пора отправить.
+
+    Захват — один UPDATE с меткой пакета, поэтому фоновый поток и
+    команда send_outbox в другом процессе не отправят письмо дважды.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.StatusChoices.PENDING, next_attempt__lte=now
+    )
+    ids = list(due.order_by('pk').values_list('pk', flat=True)[:size])
+    if not ids:
+        return []
+    claim = uuid4()
+    due.filter(pk__in=ids).update(
+        claim=claim, next_attempt=now + timedelta(seconds=CLAIM_TIMEOUT)
+    )
+    return list(OutgoingEmail.objects.filter(claim=claim))
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: удваивается с каждой ошибкой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def record_failure(email, error):
+    attempts = email.attempts + 1
+    exhausted = attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        attempts=attempts,
+        status=(
+            OutgoingEmail.StatusChoices.FAILED if exhausted
+            else OutgoingEmail.StatusChoices.PENDING
+        ),
+        # Неотправленный код больше не понадобится: текст не храним.
+        body='' if exhausted else email.body,
+        next_attempt=timezone.now() + retry_delay(attempts),
+        claim=None,
+        last_error=f'{type(error).__name__}: {error}'
+    )
+
+
+def deliver_batch(emails):
+    """
+    Отправляет пакет писем через одно соединение с почтовым сервером.
+
+    Ошибка отдельного письма откладывает только его; если соединение
+    не открылось, откладывается весь пакет.
+    """
+    sent, failed = [], []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email or None,
+                    [email.recipient], connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    record_failure(email, error)
+                    failed.append(email.pk)
+                else:
+                    sent.append(email.pk)
+    except Exception as error:
+        for email in emails:
+            if email.pk not in sent and email.pk not in failed:
+                record_failure(email, error)
+    # Текст письма содержит действующий код подтверждения: после
+    # отправки он больше не нужен и в таблице не хранится.
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        body='',
+        status=OutgoingEmail.StatusChoices.SENT,
+        sent=timezone.now(),
+        claim=None
+    )
+    return len(sent)
+
+
+def deliver_outbox(batch_size=None):
+    """
+    Отправляет пакетами все письма, которые пора отправить.
+    Возвращает число отправленных писем.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    delivered = 0
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return delivered
+        delivered += deliver_batch(emails)
+
+
+def next_attempt_delay():
+    """Секунд до ближайшей повторной попытки или None, если ждать нечего."""
+    next_attempt = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.StatusChoices.PENDING
+    ).order_by('next_attempt').values_list('next_attempt', flat=True).first()
+    if next_attempt is None:
+        return None
+    return max(0, (next_attempt - timezone.now()).total_seconds())
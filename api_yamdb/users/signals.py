@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Права доступа пользователей изменены массово, в обход save()
+# (QuerySet.update, bulk_update); аргумент user_ids — затронутые id.
+access_changed = Signal()
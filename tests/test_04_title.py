@@ -353,3 +353,38 @@ class Test04TitleAPI:
             f'Проверьте, что PUT-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE} '
             'не предусмотрен и возвращает статус 405.'
         )
+
+    def test_07_titles_genres_resolved_in_one_query(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Поезд на Юму',
+            'year': 1957,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug']
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        genre_selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_genre"' in query['sql']
+            and 'reviews_title_genre' not in query['sql']
+        ]
+        assert len(genre_selects) == 1, (
+            f'Проверьте, что POST-запрос к `{self.TITLES_URL}` с '
+            f'{len(genres)} жанрами находит их одним запросом к БД.'
+        )
+
+        data['genre'] = [genres[0]['slug'], 'western', 'noir']
+        response = admin_client.post(self.TITLES_URL, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        message = ' '.join(response.json()['genre'])
+        assert 'western' in message and 'noir' in message, (
+            'Проверьте, что ответ со статусом 400 перечисляет все '
+            'несуществующие slug жанров.'
+        )
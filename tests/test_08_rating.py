@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        from reviews.models import Title
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Так себе', 2)
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating, title.reviews_count) == (4, 2), (
+            'Проверьте, что при создании отзыва сохранённые рейтинг и '
+            'количество отзывов произведения пересчитываются.'
+        )
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.json()['rating'] == 6, (
+            'Проверьте, что при изменении оценки отзыва рейтинг '
+            'произведения пересчитывается.'
+        )
+
+        admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        title.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (2, 1), (
+            'Проверьте, что при удалении отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        user.delete()
+        title.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (None, 0), (
+            'Проверьте, что при каскадном удалении отзывов рейтинг '
+            'произведения сбрасывается.'
+        )
+
+    def test_02_update_ratings_command(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        Title.objects.update(rating=None, reviews_count=0)
+
+        call_command('update_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.reviews_count) == (5, 1), (
+            'Проверьте, что команда `update_ratings` пересчитывает '
+            'сохранённые рейтинги произведений.'
+        )
+
+    def test_03_cascade_delete_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Category, Comment, Review, Title, User
+
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title, other = (
+            Title.objects.create(name=name, year=2000, category=category)
+            for name in ('Удаляемое', 'Другое')
+        )
+        User.objects.bulk_create([
+            User(username=f'author{number}', email=f'a{number}@yamdb.fake')
+            for number in range(50)
+        ])
+        authors = list(User.objects.order_by('pk'))
+        Review.objects.bulk_create(
+            [Review(title=title, author=a, text='-', score=5) for a in authors]
+            + [Review(title=other, author=a, text='-', score=a.pk % 10 + 1)
+               for a in authors[:2]]
+        )
+        Comment.objects.bulk_create([
+            Comment(review=review, author=authors[0], text='-')
+            for review in Review.objects.filter(title=title)
+        ])
+        Title.objects.update_rating()
+
+        with CaptureQueriesContext(connection) as context:
+            title.delete()
+        assert len(context) < 25, (
+            'Проверьте, что удаление произведения не пересчитывает '
+            'рейтинг для каждого каскадно удалённого отзыва.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            authors[0].delete()
+        assert len(context) < 25, (
+            'Проверьте, что удаление автора не пересчитывает рейтинг '
+            'для каждого его отзыва.'
+        )
+        other.refresh_from_db()
+        remaining = Review.objects.get(title=other)
+        assert (other.rating, other.reviews_count) == (remaining.score, 1), (
+            'Проверьте, что после удаления автора рейтинг произведений '
+            'его отзывов пересчитывается.'
+        )
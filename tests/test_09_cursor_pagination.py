@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def collect_pages(client, url, link='next'):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` в режиме курсора '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора ответ не содержит `count`.'
+        )
+        pages.append(data)
+        url = data[link]
+    return pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self, admin):
+        from reviews.models import Category, Review, Title
+
+        category = Category.objects.create(name='Фильм', slug='films')
+        titles = [
+            Title.objects.create(
+                name=f'Произведение {idx % 7}', year=1950 + idx % 5,
+                category=category
+            )
+            for idx in range(25)
+        ]
+        for score, title in enumerate(titles[:9], 1):
+            Review.objects.create(
+                title=title, author=admin, text='Отзыв', score=score
+            )
+        return Title.objects.all()
+
+    @pytest.mark.parametrize(
+        'ordering', ('', 'name', '-year', 'rating', '-rating')
+    )
+    def test_01_titles_cursor_walk(self, client, titles, ordering):
+        page_number_ids = []
+        page_url = f'{self.TITLES_URL}?ordering={ordering}'
+        while page_url:
+            data = client.get(page_url).json()
+            page_number_ids.extend(item['id'] for item in data['results'])
+            page_url = data['next']
+
+        pages = collect_pages(
+            client, f'{self.TITLES_URL}?pagination=cursor&ordering={ordering}'
+        )
+        cursor_ids = [
+            item['id'] for page in pages for item in page['results']
+        ]
+        assert len(cursor_ids) == len(set(cursor_ids)) == titles.count(), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает каждое произведение ровно один раз.'
+        )
+        if not ordering:
+            assert cursor_ids == page_number_ids, (
+                'Проверьте, что курсорная пагинация сохраняет порядок '
+                'сортировки `/api/v1/titles/`.'
+            )
+
+        backward = collect_pages(client, pages[-1]['previous'], 'previous')
+        backward_ids = [
+            item['id'] for page in reversed(backward)
+            for item in page['results']
+        ]
+        assert backward_ids == cursor_ids[:len(backward_ids)], (
+            'Проверьте, что ссылка `previous` в режиме курсора возвращает '
+            'предыдущие страницы в том же порядке.'
+        )
+
+    def test_02_titles_cursor_with_filter(self, client, titles):
+        pages = collect_pages(
+            client, f'{self.TITLES_URL}?pagination=cursor&year=1950'
+        )
+        years = {
+            item['year'] for page in pages for item in page['results']
+        }
+        count = sum(len(page['results']) for page in pages)
+        assert years == {1950} and count == 5, (
+            'Проверьте, что курсорная пагинация учитывает фильтры '
+            '`/api/v1/titles/`.'
+        )
+
+    def test_03_invalid_cursor(self, client, titles):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что некорректный курсор возвращает ответ со '
+            'статусом 404.'
+        )
+
+    def test_04_reviews_and_comments_cursor_walk(self, client, titles,
+                                                 django_user_model):
+        from reviews.models import Comment, Review
+
+        title = titles.filter(reviews_count=0).first()
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(23)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        Review.objects.filter(pk__in=[r.pk for r in reviews[:10]]).update(
+            pub_date=reviews[0].pub_date
+        )
+        for author in authors:
+            Comment.objects.create(
+                review=reviews[0], author=author, text='Комментарий'
+            )
+
+        urls = (
+            (f'/api/v1/titles/{title.id}/reviews/', len(reviews)),
+            (
+                f'/api/v1/titles/{title.id}/reviews/{reviews[0].id}/'
+                'comments/',
+                len(authors)
+            ),
+        )
+        for url, expected_count in urls:
+            expected_ids = []
+            page_url = url
+            while page_url:
+                data = client.get(page_url).json()
+                expected_ids.extend(item['id'] for item in data['results'])
+                page_url = data['next']
+            pages = collect_pages(client, f'{url}?pagination=cursor')
+            cursor_ids = [
+                item['id'] for page in pages for item in page['results']
+            ]
+            assert len(set(cursor_ids)) == expected_count, (
+                f'Проверьте, что курсорная пагинация `{url}` возвращает '
+                'каждый объект ровно один раз.'
+            )
+            assert set(cursor_ids) == set(expected_ids)
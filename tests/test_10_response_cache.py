@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_anonymous_get_is_cached(self, client, admin_client):
+        create_titles(admin_client)
+        first = client.get(f'{self.TITLES_URL}?year=1984&ordering=name')
+
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(f'{self.TITLES_URL}?ordering=name&year=1984')
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json(), (
+            'Проверьте, что закэшированный ответ совпадает с исходным.'
+        )
+        assert len(context) == 1, (
+            'Проверьте, что повторный анонимный GET-запрос к '
+            f'`{self.TITLES_URL}` с теми же параметрами обслуживается '
+            'из кэша одним запросом версии к БД.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(self.TITLES_URL)
+        assert len(context) > 0, (
+            'Проверьте, что запросы с токеном не обслуживаются из кэша.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, genres = create_titles(admin_client)
+        title_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(title_url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        assert client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что создание отзыва сбрасывает кэш '
+            f'`{self.TITLES_URL}`.'
+        )
+
+        assert len(client.get(self.GENRES_URL).json()['results']) == 3
+        admin_client.post(
+            self.GENRES_URL, data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        assert len(client.get(self.GENRES_URL).json()['results']) == 4, (
+            'Проверьте, что создание жанра сбрасывает кэш '
+            f'`{self.GENRES_URL}`.'
+        )
+
+        admin_client.patch(title_url, data={'genre': ['western']})
+        genre = client.get(title_url).json()['genre']
+        assert genre == [{'name': 'Вестерн', 'slug': 'western'}], (
+            'Проверьте, что изменение жанров произведения сбрасывает кэш '
+            f'`{self.TITLES_URL}`.'
+        )
+
+    def test_03_cache_key_includes_host(self, client, admin_client,
+                                        monkeypatch):
+        from api.v1.pagination import OptInKeysetPagination
+
+        monkeypatch.setattr(OptInKeysetPagination, 'page_size', 1)
+        create_titles(admin_client)
+        url = self.TITLES_URL
+        first = client.get(url, HTTP_HOST='one.yamdb.fake')
+        second = client.get(url, HTTP_HOST='two.yamdb.fake', secure=True)
+        assert first.json()['next'].startswith('http://one.yamdb.fake/')
+        assert second.json()['next'].startswith('https://two.yamdb.fake/'), (
+            'Проверьте, что ответ с абсолютными ссылками пагинации не '
+            'отдаётся из кэша клиенту другого хоста или схемы.'
+        )
+
+    def test_04_one_invalidation_per_delete(self, admin_client, admin,
+                                            user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        with CaptureQueriesContext(connection) as context:
+            admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_catalogueversion"')
+        ]
+        assert len(updates) == 1, (
+            'Проверьте, что каскадное удаление сбрасывает версии кэша '
+            'одним запросом, а не по запросу на каждую строку.'
+        )
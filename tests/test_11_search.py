@@ -0,0 +1,191 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Книга', slug='books')
+        data = (
+            ('Мастер и Маргарита', 'Роман о дьяволе в Москве'),
+            ('Собачье сердце', 'Повесть, сатира на эксперименты'),
+            ('Записки юного врача', 'Рассказы о работе Мастера медицины'),
+            ('Белая гвардия', None),
+        )
+        return [
+            Title.objects.create(
+                name=name, description=description, year=1925,
+                category=category
+            )
+            for name, description in data
+        ]
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        return [item['name'] for item in response.json()['results']]
+
+    def cursor_pages(self, client, params):
+        """Названия со всех страниц режима курсора."""
+        names = []
+        url, params = self.TITLES_URL, {**params, 'pagination': 'cursor'}
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == HTTPStatus.OK
+            names += [item['name'] for item in response.json()['results']]
+            url, params = response.json()['next'], None
+        return names
+
+    def search_by_name(self, client, value):
+        response = client.get(self.TITLES_URL, {'name': value})
+        return [item['name'] for item in response.json()['results']]
+
+    def test_01_search_endpoint(self, client, titles):
+        assert self.search(client, 'мастер') == [
+            'Мастер и Маргарита', 'Записки юного врача'
+        ], (
+            'Проверьте, что параметр `search` ищет по названию и описанию '
+            'без учёта регистра и ранжирует совпадения в названии выше.'
+        )
+        assert self.search(client, 'сатир') == ['Собачье сердце'], (
+            'Проверьте, что параметр `search` находит слова по префиксу.'
+        )
+        assert self.search(client, 'мастер москв') == [
+            'Мастер и Маргарита'
+        ], (
+            'Проверьте, что параметр `search` требует совпадения '
+            'всех слов запроса.'
+        )
+
+    def test_02_index_follows_title_writes(self, client, admin_client,
+                                           titles):
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[3].id}/',
+            data={'description': 'Роман о Гражданской войне'}
+        )
+        assert self.search(client, 'гражданской') == ['Белая гвардия'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        titles[3].delete()
+        assert self.search(client, 'гражданской') == [], (
+            'Проверьте, что удалённое произведение исключается из '
+            'поискового индекса.'
+        )
+
+    def test_03_fallback_backend(self, titles):
+        from reviews.models import Title
+        from reviews.search import TermIndexTitleSearchBackend
+
+        backend = TermIndexTitleSearchBackend()
+        backend.rebuild()
+        result = backend.filter(Title.objects.all(), 'Мастер')
+        assert [title.name for title in result] == [
+            'Мастер и Маргарита', 'Записки юного врача'
+        ], (
+            'Проверьте, что запасной бэкенд поиска ранжирует совпадения '
+            'в названии выше.'
+        )
+        result = backend.filter(Title.objects.all(), 'мастер москв')
+        assert [title.name for title in result] == ['Мастер и Маргарита']
+
+    def test_04_cyrillic_case_insensitive_filters(self, client, admin_client,
+                                                  titles):
+        assert self.search_by_name(client, 'МАРГАРИТ') == [
+            'Мастер и Маргарита'
+        ], (
+            'Проверьте, что фильтр `name` `/api/v1/titles/` не учитывает '
+            'регистр кириллицы.'
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Фантастика', 'slug': 'sf'}
+        )
+        response = client.get('/api/v1/genres/', {'search': 'фАНТ'})
+        assert [item['slug'] for item in response.json()['results']] == [
+            'sf'
+        ], (
+            'Проверьте, что поиск `/api/v1/genres/` не учитывает регистр '
+            'кириллицы.'
+        )
+
+    def test_05_username_search(self, admin_client, django_user_model):
+        django_user_model.objects.create_user(
+            username='Пользователь', email='cyrillic@yamdb.fake'
+        )
+        django_user_model.objects.create_user(
+            username='joann', email='joann@yamdb.fake'
+        )
+        response = admin_client.get('/api/v1/users/', {'search': 'пользов'})
+        assert [item['username'] for item in response.json()['results']] == [
+            'Пользователь'
+        ], (
+            'Проверьте, что поиск `/api/v1/users/` находит пользователя по '
+            'имени без учёта регистра.'
+        )
+        response = admin_client.get('/api/v1/users/', {'search': 'ANN'})
+        assert [item['username'] for item in response.json()['results']] == [
+            'joann'
+        ], (
+            'Проверьте, что поиск `/api/v1/users/` находит подстроку '
+            'в любой части имени.'
+        )
+
+    def test_06_fuzzy_search(self, client, titles):
+        response = client.get(self.TITLES_URL, {'fuzzy': 'маргорита'})
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Мастер и Маргарита'], (
+            'Проверьте, что параметр `fuzzy` `/api/v1/titles/` находит '
+            'произведение по названию с опечаткой.'
+        )
+        response = client.get(self.TITLES_URL, {'fuzzy': 'сабачье серце'})
+        names = [item['name'] for item in response.json()['results']]
+        assert names[:1] == ['Собачье сердце'], (
+            'Проверьте, что параметр `fuzzy` ранжирует результаты '
+            'по сходству.'
+        )
+
+    @pytest.mark.parametrize('backend', ('fts5', 'term_index'))
+    def test_07_search_cursor(self, client, titles, monkeypatch, backend):
+        from api.v1 import filters
+        from api.v1.pagination import OptInKeysetPagination
+        from reviews.search import TermIndexTitleSearchBackend
+
+        if backend == 'term_index':
+            TermIndexTitleSearchBackend().rebuild()
+            monkeypatch.setattr(
+                filters, 'get_title_search_backend',
+                TermIndexTitleSearchBackend
+            )
+        monkeypatch.setattr(OptInKeysetPagination, 'page_size', 1)
+        assert self.cursor_pages(client, {'search': 'мастер'}) == [
+            'Мастер и Маргарита', 'Записки юного врача'
+        ], (
+            'Проверьте, что режим курсора сохраняет ранжирование '
+            'полнотекстового поиска `search`.'
+        )
+
+    def test_08_fuzzy_search_cursor(self, client, titles, monkeypatch):
+        from api.v1.pagination import OptInKeysetPagination
+        from reviews.models import Title
+
+        for name in ('Мастер', 'Мастера', 'Мастерская'):
+            Title.objects.create(
+                name=name, year=1925, category=titles[0].category
+            )
+        params = {'fuzzy': 'мастер'}
+        ranked = [
+            item['name'] for item in
+            client.get(self.TITLES_URL, params).json()['results']
+        ]
+        monkeypatch.setattr(OptInKeysetPagination, 'page_size', 1)
+        assert len(ranked) > 1
+        assert self.cursor_pages(client, params) == ranked, (
+            'Проверьте, что режим курсора сохраняет ранжирование '
+            'нечёткого поиска `fuzzy`.'
+        )
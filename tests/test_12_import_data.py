@@ -0,0 +1,283 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ImportData:
+
+    @pytest.fixture
+    def data_path(self, tmp_path):
+        source = os.path.join(settings.BASE_DIR, 'static', 'data')
+        for filename in os.listdir(source):
+            shutil.copy(os.path.join(source, filename), tmp_path)
+        return tmp_path
+
+    def import_data(self, data_path, *args):
+        out = StringIO()
+        call_command(
+            'import_data', '--data-path', str(data_path),
+            '--batch-size', '20', *args, stdout=out, stderr=StringIO()
+        )
+        return out.getvalue()
+
+    def rows_count(self, data_path, filename):
+        with open(data_path / filename, encoding='utf-8', newline='') as f:
+            return sum(1 for _ in csv.DictReader(f))
+
+    def test_01_fresh_load(self, data_path):
+        from reviews.models import Comment, Review, Title
+
+        output = self.import_data(data_path, '--fresh')
+        assert 'Перестроение индексов: ' in output, (
+            'Проверьте, что режим `--fresh` выводит время каждого этапа.'
+        )
+        assert Title.objects.count() == self.rows_count(
+            data_path, 'titles.csv'
+        )
+        assert Review.objects.count() == self.rows_count(
+            data_path, 'review.csv'
+        )
+        assert Comment.objects.count() == self.rows_count(
+            data_path, 'comments.csv'
+        )
+        assert Title.objects.filter(reviews_count__gt=0).exists(), (
+            'Проверьте, что после импорта пересчитываются рейтинги.'
+        )
+
+    def test_02_incremental_import(self, data_path):
+        from reviews.models import Review
+
+        self.import_data(data_path)
+        review_path = data_path / 'review.csv'
+        content = review_path.read_text(encoding='utf-8')
+        review_path.write_text(
+            content.replace('Ставлю десять звёзд!', 'Ставлю девять звёзд!'),
+            encoding='utf-8'
+        )
+        output = self.import_data(data_path)
+        assert 'Импорт произведений: файл не изменился' in output, (
+            'Проверьте, что повторный импорт пропускает неизменённые файлы.'
+        )
+        assert 'пропущено неизменённых пакетов' in output, (
+            'Проверьте, что повторный импорт пропускает неизменённые пакеты.'
+        )
+        assert Review.objects.get(pk=1).text.startswith(
+            'Ставлю девять звёзд!'
+        ), 'Проверьте, что изменённые строки CSV обновляют записи.'
+
+    def test_03_ratings_of_changed_reviews(self, data_path):
+        from django.db.models import Avg
+        from django.db.models.functions import Round
+        from reviews.models import Review, Title
+
+        self.import_data(data_path)
+        versions = dict(Title.objects.values_list('pk', 'updated_at'))
+        review_path = data_path / 'review.csv'
+        with open(review_path, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        rows[0]['score'] = '1'
+        with open(review_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        self.import_data(data_path)
+        rewritten = {int(row['title_id']) for row in rows[:20]}
+        changed = {
+            pk for pk, updated_at in Title.objects.values_list(
+                'pk', 'updated_at'
+            )
+            if updated_at != versions[pk]
+        }
+        assert changed == rewritten, (
+            'Проверьте, что рейтинги пересчитываются только для '
+            'произведений из записанных пакетов отзывов.'
+        )
+        title = Title.objects.get(pk=rows[0]['title_id'])
+        assert title.rating == Review.objects.filter(
+            title=title
+        ).aggregate(value=Round(Avg('score')))['value']
+
+        versions = dict(Title.objects.values_list('pk', 'updated_at'))
+        output = self.import_data(data_path)
+        assert 'Пересчёт рейтингов' not in output
+        assert dict(
+            Title.objects.values_list('pk', 'updated_at')
+        ) == versions, (
+            'Проверьте, что импорт без изменений в review.csv не '
+            'пересчитывает рейтинги и не меняет даты изменения.'
+        )
+
+    def test_04_export_round_trip(self, data_path, tmp_path_factory):
+        from reviews.models import (
+            Category, Genre, ImportCheckpoint, Review, Title, User
+        )
+
+        self.import_data(data_path)
+        Title.objects.filter(pk=1).update(description='Тюремная драма')
+        counts = (Title.objects.count(), Review.objects.count())
+        export_path = tmp_path_factory.mktemp('export')
+        call_command(
+            'export_data', '--output-path', str(export_path), '--gzip',
+            '--chunk-size', '10', stdout=StringIO()
+        )
+        assert (export_path / 'review.csv.gz').exists(), (
+            'Проверьте, что `export_data --gzip` сжимает файлы.'
+        )
+
+        for model in (User, Title, Category, Genre, ImportCheckpoint):
+            model.objects.all().delete()
+        self.import_data(export_path, '--fresh')
+        assert (Title.objects.count(), Review.objects.count()) == counts, (
+            'Проверьте, что `import_data` загружает файлы, выгруженные '
+            '`export_data`.'
+        )
+        assert Title.objects.get(pk=1).description == 'Тюремная драма'
+
+        call_command(
+            'export_data', '--output-path', str(export_path),
+            '--format', 'ndjson', stdout=StringIO()
+        )
+        lines = (export_path / 'review.ndjson').read_text(
+            encoding='utf-8'
+        ).splitlines()
+        assert len(lines) == counts[1], (
+            'Проверьте, что `export_data --format ndjson` пишет по одной '
+            'записи в строке.'
+        )
+
+    def test_05_validate_only(self, data_path):
+        from reviews.models import Review
+
+        with open(data_path / 'review.csv', 'a', encoding='utf-8') as f:
+            f.write('\n9001,1,Повтор,100,5,2019-09-24T21:08:21.567Z')
+            f.write('\n9002,1,Вне шкалы,101,11,2019-09-24T21:08:21.567Z')
+            f.write('\n9003,9999,Нет произведения,102,5,2019-09-24T21:08Z\n')
+        with open(data_path / 'titles.csv', 'a', encoding='utf-8') as f:
+            f.write('\n9001,Из будущего,3000,1\n')
+        report_path = data_path / 'report.csv'
+        with pytest.raises(CommandError):
+            self.import_data(
+                data_path, '--validate-only', '--report', str(report_path)
+            )
+        with open(report_path, encoding='utf-8', newline='') as f:
+            messages = [
+                (row['file'], row['message']) for row in csv.DictReader(f)
+            ]
+        expected = {
+            ('titles.csv', 'год 3000 больше текущего'),
+            ('review.csv', 'повторный отзыв автора 100 на произведение 1'),
+            ('review.csv', 'оценка 11 вне диапазона'),
+            ('review.csv', 'title_id: нет объекта с id 9999'),
+        }
+        for filename, text in expected:
+            assert any(
+                file == filename and message.startswith(text)
+                for file, message in messages
+            ), (
+                'Проверьте, что `import_data --validate-only` сообщает '
+                f'об ошибке «{text}» в {filename}.'
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что `import_data --validate-only` не пишет в базу.'
+        )
+
+    def test_06_nested_list_versions(self, data_path, client):
+        from http import HTTPStatus
+
+        self.import_data(data_path)
+        comments_url = '/api/v1/titles/5/reviews/6/comments/'
+        reviews_url = '/api/v1/titles/1/reviews/'
+        etags = {
+            url: client.get(url)['ETag'] for url in (comments_url, reviews_url)
+        }
+        with open(data_path / 'comments.csv', 'a', encoding='utf-8') as f:
+            f.write('\n4,6,Новый комментарий,101,2020-01-13T23:20:02.422Z\n')
+        users_path = data_path / 'users.csv'
+        users_path.write_text(
+            users_path.read_text(encoding='utf-8').replace(
+                '100,bingobongo,', '100,bongobingo,'
+            ),
+            encoding='utf-8'
+        )
+        self.import_data(data_path)
+        for url, etag in etags.items():
+            assert client.get(
+                url, HTTP_IF_NONE_MATCH=etag
+            ).status_code == HTTPStatus.OK, (
+                'Проверьте, что импорт комментариев и смена имени автора '
+                f'меняют ETag вложенного списка `{url}`.'
+            )
+
+    def test_07_unique_conflicts_reported(self, data_path):
+        from reviews.models import Review, User
+
+        self.import_data(data_path)
+        with open(data_path / 'review.csv', 'a', encoding='utf-8') as f:
+            f.write('\n9001,1,Повтор,100,5,2019-09-24T21:08:21.567Z\n')
+        with open(data_path / 'users.csv', 'a', encoding='utf-8') as f:
+            f.write('\n9001,bingobongo,other@yamdb.fake,user,,,\n')
+        for _ in range(2):
+            err = StringIO()
+            call_command(
+                'import_data', '--data-path', str(data_path),
+                '--batch-size', '20', stdout=StringIO(), stderr=err
+            )
+            for text in (
+                'уже есть запись с author_id=100, title_id=1',
+                'уже есть запись с username=bingobongo',
+            ):
+                assert text in err.getvalue(), (
+                    'Проверьте, что строки, нарушающие уникальность, '
+                    'выводятся как ошибки и не отмечаются контрольной '
+                    'точкой.'
+                )
+        assert not Review.objects.filter(pk=9001).exists()
+        assert not User.objects.filter(pk=9001).exists()
+
+    def test_08_extra_columns(self, data_path):
+        from reviews.models import Review
+
+        with open(data_path / 'review.csv', 'a', encoding='utf-8') as f:
+            f.write('\n9001,1,Лишнее,101,5,2019-09-24T21:08:21.567Z,x,y\n')
+        err = StringIO()
+        call_command(
+            'import_data', '--data-path', str(data_path),
+            '--batch-size', '20', stdout=StringIO(), stderr=err
+        )
+        assert 'лишние значения' in err.getvalue(), (
+            'Проверьте, что строка с лишними значениями выводится как '
+            'ошибка и не прерывает импорт.'
+        )
+        assert Review.objects.count() == self.rows_count(
+            data_path, 'review.csv'
+        ) - 1
+
+    def test_09_parallel_parsing(self, data_path):
+        from reviews.models import (
+            Category, Comment, Genre, ImportCheckpoint, Review, Title, User
+        )
+
+        models = (User, Category, Genre, Title, Review, Comment)
+
+        def counts():
+            return [model.objects.count() for model in models]
+
+        self.import_data(data_path)
+        expected = counts()
+        assert all(expected)
+        for model in (Title, User, Category, Genre, ImportCheckpoint):
+            model.objects.all().delete()
+        output = self.import_data(data_path, '--workers', '2')
+        assert 'Все данные успешно импортированы!' in output
+        assert counts() == expected, (
+            'Проверьте, что `import_data --workers 2` загружает столько '
+            'же строк, сколько импорт в одном процессе.'
+        )
@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportJobs:
+
+    IMPORTS_URL = '/api/v1/imports/'
+
+    @pytest.fixture(autouse=True)
+    def upload_dir(self, settings, tmp_path):
+        settings.IMPORT_UPLOAD_DIR = tmp_path
+        return tmp_path
+
+    def upload(self, client, entity, content):
+        return client.post(
+            self.IMPORTS_URL,
+            data={
+                'entity': entity,
+                'file': SimpleUploadedFile(
+                    f'{entity}.csv', content.encode('utf-8')
+                ),
+            }
+        )
+
+    def wait_for_jobs(self):
+        from api.v1.services import ImportJobService
+
+        # Поток обработки один: пустая задача выполнится после загрузок.
+        ImportJobService.executor.submit(lambda: None).result(timeout=10)
+
+    def test_01_upload_and_poll(self, admin_client, upload_dir):
+        response = self.upload(
+            admin_client, 'genre',
+            'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\nx,Ошибка,bad\n'
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что POST-запрос администратора к '
+            f'`{self.IMPORTS_URL}` сразу возвращает статус 202.'
+        )
+        job_id = response.json()['id']
+        self.wait_for_jobs()
+
+        response = admin_client.get(f'{self.IMPORTS_URL}{job_id}/')
+        assert response.status_code == HTTPStatus.OK
+        job = response.json()
+        assert (job['status'], job['processed'], job['error_count']) == (
+            'done', 2, 1
+        ), (
+            'Проверьте, что загрузка обрабатывается в фоне, а ход работы '
+            'и ошибки строк доступны по id задачи.'
+        )
+        assert job['errors'][0]['line'] == 3
+
+        response = admin_client.get('/api/v1/genres/')
+        assert {item['slug'] for item in response.json()['results']} == {
+            'drama', 'comedy'
+        }
+        assert list(upload_dir.iterdir()) == [], (
+            'Проверьте, что загруженный файл удаляется после обработки.'
+        )
+
+    def test_02_admin_only(self, client, user_client, moderator_client):
+        for api_client in (client, user_client, moderator_client):
+            response = self.upload(api_client, 'genre', 'id,name,slug\n')
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            ), (
+                f'Проверьте, что `{self.IMPORTS_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_03_invalid_entity(self, admin_client):
+        response = self.upload(admin_client, 'secrets', 'id\n1\n')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что загрузка неизвестного типа данных отклоняется.'
+        )
@@ -0,0 +1,154 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    def revalidate(self, api_client, url, response):
+        """Повторяет запрос с If-None-Match и считает запросы к БД."""
+        with CaptureQueriesContext(connection) as context:
+            repeated = api_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        return repeated, len(context)
+
+    def test_01_not_modified(self, client, admin_client, admin, user_client,
+                             user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        urls = (
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/titles/?year=1984',
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит ETag.'
+            )
+            assert response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'Last-Modified.'
+            )
+            repeated, queries = self.revalidate(client, url, response)
+            assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match получает ответ со статусом 304.'
+            )
+            assert queries <= 1, (
+                f'Проверьте, что ответ 304 для `{url}` обходится не более '
+                'чем одним запросом к БД.'
+            )
+
+    def test_02_changes_update_etag(self, admin_client, admin, user_client,
+                                    user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        title_response = admin_client.get(title_url)
+        reviews_response = admin_client.get(reviews_url)
+
+        admin_client.delete(f'{reviews_url}{reviews[0]["id"]}/')
+        for url, response in (
+            (title_url, title_response), (reviews_url, reviews_response)
+        ):
+            repeated, _ = self.revalidate(admin_client, url, response)
+            assert repeated.status_code == HTTPStatus.OK, (
+                'Проверьте, что после удаления отзыва ETag произведения '
+                f'и списка отзывов меняется (`{url}`).'
+            )
+
+        title_response = admin_client.get(title_url)
+        genre_slug = titles[0]['genre'][0]
+        admin_client.delete(f'/api/v1/genres/{genre_slug}/')
+        repeated, _ = self.revalidate(admin_client, title_url, title_response)
+        assert repeated.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение жанров произведения меняет его ETag.'
+        )
+
+    def test_03_deletes_update_last_modified(self, client, admin_client,
+                                             admin, user_client, user):
+        from reviews.models import CatalogueVersion, Review
+
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        titles_url = '/api/v1/titles/'
+        comments_url = (
+            f'{titles_url}{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        # Last-Modified точен до секунды: версии сдвигаются в прошлое,
+        # чтобы изменения ниже не попали в ту же секунду.
+        past = timezone.now() - timedelta(seconds=10)
+        Review.objects.update(updated_at=past)
+        CatalogueVersion.objects.update_or_create(
+            namespace='titles',
+            defaults={'version': int(past.timestamp() * 10 ** 9)}
+        )
+        titles_response = client.get(titles_url)
+        comments_response = client.get(comments_url)
+        with CaptureQueriesContext(connection) as context:
+            repeated = client.get(
+                f'{titles_url}?pagination=cursor',
+                HTTP_IF_MODIFIED_SINCE=titles_response['Last-Modified']
+            )
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(context) == 1, (
+            'Проверьте, что версия списка произведений проверяется одним '
+            'запросом к БД.'
+        )
+
+        admin_client.delete(f'{titles_url}{titles[1]["id"]}/')
+        user_client.post(comments_url, data={'text': 'Новый комментарий'})
+        for url, response in (
+            (titles_url, titles_response), (comments_url, comments_response)
+        ):
+            repeated = client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+            assert repeated.status_code == HTTPStatus.OK, (
+                'Проверьте, что удаление произведения и новый комментарий '
+                f'меняют Last-Modified списка `{url}`.'
+            )
+
+    def test_04_list_version_shared(self, client, admin_client):
+        from django.core.cache import cache
+        from django.db.models import F
+
+        from reviews.models import CatalogueVersion
+
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        cache.clear()
+        repeated, _ = self.revalidate(client, url, response)
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что версия списка произведений хранится не только '
+            'в кэше процесса.'
+        )
+        # Так версию меняет команда управления в другом процессе.
+        CatalogueVersion.objects.filter(namespace='titles').update(
+            version=F('version') + 1
+        )
+        repeated, _ = self.revalidate(client, url, response)
+        assert repeated.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение каталога в другом процессе меняет '
+            'ETag списка произведений.'
+        )
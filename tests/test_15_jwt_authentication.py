@@ -0,0 +1,152 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15RoleJWTAuthentication:
+
+    USERS_URL = '/api/v1/users/'
+
+    def get_client(self, user):
+        from api.v1.authentication import RoleAccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+        )
+        return client
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        return response, [query['sql'] for query in context]
+
+    def test_01_reads_skip_user_lookup(self, admin):
+        client = self.get_client(admin)
+        client.get(self.USERS_URL)
+        response, queries = self.count_queries(client, self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            'WHERE "users_customuser"."id" =' in sql for sql in queries
+        ), (
+            'Проверьте, что GET-запрос с токеном, содержащим роль, '
+            'не загружает пользователя из БД.'
+        )
+
+    def test_02_role_change_invalidates_token_claims(self, admin):
+        client = self.get_client(admin)
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK
+
+        admin.role = admin.RoleChoises.USER
+        admin.save()
+        response = client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли токен со старой ролью '
+            'не даёт прав администратора.'
+        )
+
+    def test_03_me_returns_profile(self, user):
+        client = self.get_client(user)
+        client.get(f'{self.USERS_URL}me/')
+        response = client.get(f'{self.USERS_URL}me/')
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/api/v1/users/me/` возвращает профиль '
+            'пользователя из БД.'
+        )
+
+    def test_04_token_by_confirmation_code(self, client, user):
+        from api.v1.services import ConfirmationCodeService
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': ConfirmationCodeService.generate_code(user)
+        })
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что верный код подтверждения обменивается на токен.'
+        )
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        assert api_client.get(f'{self.USERS_URL}me/').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_05_bulk_role_change_invalidates_token_claims(self, admin,
+                                                          moderator):
+        from users.models import CustomUser
+
+        admin_client = self.get_client(admin)
+        moderator_client = self.get_client(moderator)
+        assert admin_client.get(self.USERS_URL).status_code == HTTPStatus.OK
+
+        CustomUser.objects.filter(pk=admin.pk).update(
+            role=CustomUser.RoleChoises.USER
+        )
+        assert admin_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что QuerySet.update(role=...) повышает версию прав '
+            'и токен со старой ролью не даёт прав администратора.'
+        )
+
+        admin.refresh_from_db()
+        moderator.role = CustomUser.RoleChoises.ADMIN
+        admin.bio = 'Без изменения прав'
+        CustomUser.objects.bulk_update((moderator, admin), ('role', 'bio'))
+        versions = dict(CustomUser.objects.values_list('pk', 'role_version'))
+        assert versions[moderator.pk] == moderator.role_version + 1
+        assert versions[admin.pk] == 1, (
+            'Проверьте, что bulk_update повышает версию прав только у '
+            'пользователей, чьи права изменились.'
+        )
+        assert moderator_client.get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.OK
+
+    def test_06_stale_load_does_not_lower_version(self, admin):
+        from api.v1.authentication import (
+            get_role_version, publish_role_versions
+        )
+
+        stale_version = admin.role_version
+        admin.role = admin.RoleChoises.USER
+        admin.save()
+        # Запрос, загрузивший строку до смены роли, публикует её позже.
+        publish_role_versions({admin.pk: stale_version})
+        assert get_role_version(admin.pk) == admin.role_version, (
+            'Проверьте, что опубликованная версия прав не понижается.'
+        )
+
+    def test_07_role_versions_expire(self, admin, monkeypatch, settings):
+        import time
+        from types import SimpleNamespace
+
+        from django.core.cache.backends import locmem
+        from django.db.models import F, QuerySet
+
+        from users.models import CustomUser
+
+        client = self.get_client(admin)
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK
+        # Роль меняет другой процесс со своим кэшем: здесь версия
+        # прав не публикуется.
+        QuerySet.update(
+            CustomUser.objects.filter(pk=admin.pk),
+            role=CustomUser.RoleChoises.USER,
+            role_version=F('role_version') + 1
+        )
+        later = time.time() + settings.ROLE_VERSION_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(locmem, 'time', SimpleNamespace(
+            time=lambda: later
+        ))
+        assert client.get(
+            self.USERS_URL
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что версия прав в кэше устаревает и смена роли '
+            'в другом процессе отзывает права токена.'
+        )
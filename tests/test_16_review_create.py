@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ReviewCreate:
+
+    def test_01_duplicate_review(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отлично', 'score': 9}
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        review_selects = [
+            query['sql'] for query in context
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert review_selects == [], (
+            'Проверьте, что создание отзыва не выполняет предварительную '
+            'проверку существующих отзывов: уникальность обеспечивает '
+            'ограничение в БД.'
+        )
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': [
+                'Можно оставить только один отзыв на произведение.'
+            ]
+        }, (
+            'Проверьте, что повторный отзыв возвращает прежнее сообщение '
+            'об ошибке.'
+        )
@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17NestedQueries:
+
+    def parent_queries(self, api_client, method, url, table, **kwargs):
+        """Выполняет запрос и считает обращения к таблице родителя."""
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(api_client, method)(url, **kwargs)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if f'FROM "{table}"' in query['sql']
+        ]
+        return response, len(queries)
+
+    def test_01_parent_fetched_once(self, client, admin_client, admin,
+                                    user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        cases = (
+            (client, 'get', reviews_url, 'reviews_title', {}),
+            (client, 'get', comments_url, 'reviews_review', {}),
+            (
+                user_client, 'post', comments_url, 'reviews_review',
+                {'data': {'text': 'Ещё комментарий'}}
+            ),
+        )
+        for api_client, method, url, table, kwargs in cases:
+            response, queries = self.parent_queries(
+                api_client, method, url, table, **kwargs
+            )
+            assert response.status_code in (
+                HTTPStatus.OK, HTTPStatus.CREATED
+            )
+            assert queries == 1, (
+                f'Проверьте, что {method.upper()}-запрос к `{url}` ищет '
+                'родительский объект не больше одного раза.'
+            )
+
+    def test_02_missing_parent(self, client, admin_client, admin,
+                               user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        review_id = reviews[0]['id']
+        other_title_id = titles[1]['id']
+        urls = (
+            '/api/v1/titles/9999/reviews/',
+            f'/api/v1/titles/9999/reviews/{review_id}/',
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/1/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что GET-запрос к `{url}` для несуществующего '
+                'или чужого родителя возвращает 404.'
+            )
+        response = user_client.post(
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/',
+            data={'text': 'Не туда'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.urls import URLResolver, reverse
+
+from tests.utils import (
+    check_query_budget, create_comments, create_reviews
+)
+
+# Бюджет запросов к БД на каждый маршрут api/v1/urls.py. В данных по
+# четыре отзыва и комментария разных авторов, так что N+1 его превысит.
+QUERY_BUDGETS = {
+    'api-root': ('get', 1),
+    'signup': ('post', 7),
+    'token': ('post', 2),
+    'user-list': ('get', 3),
+    'user-me': ('get', 2),
+    'user-detail': ('get', 2),
+    'title-list': ('get', 5),
+    'title-detail': ('get', 4),
+    'genre-list': ('get', 3),
+    'genre-detail': ('delete', 8),
+    'category-list': ('get', 3),
+    'category-detail': ('delete', 6),
+    'import-list': ('get', 3),
+    'import-detail': ('get', 2),
+    'review-list': ('get', 4),
+    'review-detail': ('get', 3),
+    'comment-list': ('get', 4),
+    'comment-detail': ('get', 3),
+}
+
+
+def route_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from route_names(pattern.url_patterns)
+        else:
+            yield pattern.name
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18QueryBudget:
+
+    def test_01_every_route_has_budget(self):
+        from api.v1 import urls
+
+        missing = set(route_names(urls.urlpatterns)) - set(QUERY_BUDGETS)
+        assert not missing, (
+            'Проверьте, что для каждого маршрута `api/v1/urls.py` задан '
+            f'бюджет запросов в QUERY_BUDGETS; нет бюджета: {missing}.'
+        )
+
+    def test_02_query_budgets(self, admin_client, admin, user_client, user,
+                              moderator_client, moderator,
+                              user_superuser_client, user_superuser,
+                              monkeypatch):
+        from api.v1.services import EmailOutboxService
+        from reviews.models import Category, ImportJob
+
+        # Письма отправляет фоновый поток, в бюджет запроса они не входят.
+        monkeypatch.setattr(EmailOutboxService, 'wake', lambda: None)
+
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+            user_superuser: user_superuser_client,
+        })
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        Category.objects.create(name='Музыка', slug='music')
+        job = ImportJob.objects.create(
+            entity=ImportJob.EntityChoices.GENRE, file_path='genre.csv',
+            created_by=admin
+        )
+        kwargs = {
+            'user-detail': {'username': user.username},
+            'title-detail': {'pk': title_id},
+            'genre-detail': {'slug': 'comedy'},
+            'category-detail': {'slug': 'music'},
+            'import-detail': {'pk': job.pk},
+            'review-list': {'title_id': title_id},
+            'review-detail': {'title_id': title_id, 'pk': review_id},
+            'comment-list': {'title_id': title_id, 'review_id': review_id},
+            'comment-detail': {
+                'title_id': title_id, 'review_id': review_id,
+                'pk': comments[0]['id']
+            },
+        }
+        data = {
+            'signup': {'username': 'newcomer', 'email': 'new@yamdb.fake'},
+            'token': {'username': user.username, 'confirmation_code': '1'},
+        }
+        for name, (method, budget) in QUERY_BUDGETS.items():
+            url = reverse(f'api:v1:{name}', kwargs=kwargs.get(name))
+            with check_query_budget(budget, f'{method.upper()} `{url}`'):
+                response = getattr(admin_client, method)(
+                    url, data=data.get(name)
+                )
+            assert response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR
+
+    def test_03_query_inspector(self, client, admin_client, admin,
+                                user_client, user):
+        from api.middleware import (
+            QUERY_COUNT_HEADER, TRANSACTION_PATTERN, QueryRecorder
+        )
+        from reviews.models import Review
+
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert response.has_header(QUERY_COUNT_HEADER), (
+            'Проверьте, что в режиме отладки ответ содержит число '
+            f'запросов к БД в заголовке {QUERY_COUNT_HEADER}.'
+        )
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            authors = [review.author for review in Review.objects.all()]
+        assert recorder.repeated(len(authors)), (
+            'Проверьте, что QueryRecorder находит повторы запросов '
+            'одной формы.'
+        )
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            admin_client.post('/api/v1/titles/', data={
+                'name': 'Чужой', 'year': 1979, 'genre': titles[0]['genre'],
+                'category': titles[0]['category']
+            })
+        assert not any(
+            TRANSACTION_PATTERN.match(shape)
+            for shape, _ in recorder.repeated(2)
+        ), (
+            'Проверьте, что QueryRecorder не считает повторами запросы '
+            'управления транзакциями.'
+        )
@@ -0,0 +1,46 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Benchmark:
+
+    def test_01_benchmark_report(self, tmp_path):
+        from api.management.commands.benchmark import route_patterns
+        from api.v1 import urls
+        from reviews.models import Review, Title, User
+
+        output = tmp_path / 'benchmark.json'
+        call_command(
+            'benchmark', '--generate', '--users', '30', '--titles', '20',
+            '--reviews', '200', '--comments', '50', '--requests', '3',
+            '--warmup', '0', '--seed', '1', '--output', str(output),
+            stdout=StringIO()
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert set(report['routes']) == set(route_patterns(urls.urlpatterns))
+        for name, result in report['routes'].items():
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+            assert all(int(code) < 500 for code in result['statuses']), (
+                f'Проверьте, что маршрут `{name}` отвечает без ошибок '
+                'сервера на синтетических данных.'
+            )
+        assert report['dataset']['review'] == Review.objects.count() == 200
+        assert not User.objects.filter(
+            username__startswith='benchmark'
+        ).exists(), 'Проверьте, что записи замера откатываются.'
+
+        title = Title.objects.order_by('-reviews_count').first()
+        assert title.reviews_count == title.reviews.count() > 1, (
+            'Проверьте, что синтетические отзывы распределены неравномерно, '
+            'а сохранённое число отзывов совпадает с фактическим.'
+        )
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        Title.objects.all().update_rating()
+        assert dict(Title.objects.values_list('pk', 'rating')) == ratings, (
+            'Проверьте, что рейтинг синтетических произведений совпадает '
+            'с пересчитанным update_rating.'
+        )
@@ -0,0 +1,85 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20GenerateData:
+
+    def generate(self, *args):
+        call_command(
+            'generate_data', '--users', '40', '--categories', '3',
+            '--genres', '5', '--titles', '30', '--reviews', '300',
+            '--comments', '60', '--batch-size', '7', '--seed', '1', *args,
+            stdout=StringIO()
+        )
+
+    def test_01_generated_dataset(self, user):
+        from reviews.models import Comment, Review, Title, User
+
+        self.generate('--zipf-exponent', '1.5', '--defer-indexes')
+        assert (
+            User.objects.count(), Title.objects.count(),
+            Review.objects.count(), Comment.objects.count()
+        ) == (41, 30, 300, 60), (
+            'Проверьте, что `generate_data` создаёт заданное число записей '
+            'и дописывает их к существующим.'
+        )
+        assert not Review.objects.values('title', 'author').annotate(
+            count=Count('pk')
+        ).filter(count__gt=1).exists(), (
+            'Проверьте, что `generate_data` соблюдает unique_review.'
+        )
+        counts = sorted(
+            Title.objects.values_list('reviews_count', flat=True),
+            reverse=True
+        )
+        assert counts[0] > 3 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы распределяются по произведениям '
+            'неравномерно (закон Ципфа).'
+        )
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        Title.objects.all().update_rating()
+        assert dict(Title.objects.values_list('pk', 'rating')) == ratings
+        for generated in User.objects.exclude(pk=user.pk)[:5]:
+            generated.full_clean()
+        assert Title.objects.filter(name_normalized='произведение 1').exists()
+
+    def test_02_score_weights(self):
+        from reviews.models import Review
+
+        self.generate('--score-weights', '0,0,0,0,0,0,0,0,0,1')
+        assert set(Review.objects.values_list('score', flat=True)) == {10}, (
+            'Проверьте, что `generate_data --score-weights` задаёт '
+            'распределение оценок.'
+        )
+
+    def test_03_invalid_usernames(self):
+        from reviews.models import User
+
+        with pytest.raises(CommandError):
+            self.generate('--username-prefix', 'bad name ')
+        with pytest.raises(CommandError):
+            self.generate('--score-weights', '1,2,3')
+        assert not User.objects.exists(), (
+            'Проверьте, что имена пользователей проверяются валидаторами '
+            'поля username до записи в базу.'
+        )
+
+    def test_04_existing_categories(self):
+        from reviews.models import Category, Title, User
+
+        with pytest.raises(CommandError):
+            self.generate('--categories', '0')
+        assert not User.objects.exists()
+
+        self.generate()
+        self.generate('--categories', '0', '--username-prefix', 'more')
+        assert Category.objects.count() == 3
+        assert Title.objects.count() == 60, (
+            'Проверьте, что при `--categories 0` произведения получают '
+            'существующие категории.'
+        )
@@ -0,0 +1,78 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21LoadTest:
+
+    def test_01_collection_steps(self):
+        from api.loadtest import load_collection
+        from api.management.commands.load_test import DEFAULT_COLLECTION
+
+        steps, variables = load_collection(
+            DEFAULT_COLLECTION, ['registration']
+        )
+        signup = steps[0]
+        assert signup.method == 'POST' and signup.expected == 200, (
+            'Проверьте, что шаги коллекции сохраняют метод и ожидаемый '
+            'статус из тестов запроса.'
+        )
+        assert '{{loadTag}}' in signup.body, (
+            'Проверьте, что имя и email в успешных шагах получают метку '
+            'виртуального пользователя.'
+        )
+        assert ('userUsername', 'username') in signup.captures
+        assert '{{loadTag}}' in variables['adminUsername']
+        assert not any(
+            name.endswith('ConfirmationCode') for name in variables
+        ), 'Проверьте, что заглушки кодов подтверждения не используются.'
+        bad_signup = next(step for step in steps if 'use_me' in step.name)
+        assert '{{loadTag}}' not in bad_signup.body, (
+            'Проверьте, что запросы, ожидающие ошибку, отправляются '
+            'без изменений.'
+        )
+
+    def test_02_load_test_report(self, live_server, settings, tmp_path):
+        from reviews.models import Title, User
+
+        # Все виртуальные пользователи регистрируются с одного IP.
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': dict.fromkeys(
+                settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+            )
+        }
+        output = tmp_path / 'load_test.json'
+        call_command(
+            'load_test', '--base-url', live_server.url, '--users', '1',
+            '--iterations', '2',
+            '--folder', 'registration', '--folder', 'categories',
+            '--folder', 'genres', '--folder', 'titles',
+            '--prefix', 'test', '--output', str(output), stdout=StringIO()
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['requests'] == sum(
+            step['requests'] for step in report['steps'].values()
+        )
+        for name, step in report['steps'].items():
+            assert step['requests'] == 2
+            assert step['p50_ms'] <= step['p95_ms'] <= step['p99_ms']
+            if name.startswith('registration'):
+                assert not step['errors'], (
+                    f'Проверьте, что шаг `{name}` получает коды '
+                    'подтверждения и токены предыдущих шагов.'
+                )
+        create_title = report['steps'][
+            'titles / titles_creation / create_title_with_full_data // Admin'
+        ]
+        assert create_title['statuses'] == {'201': 2}, (
+            'Проверьте, что токены и slug передаются между шагами, а '
+            'повторные проходы не конфликтуют по уникальным полям.'
+        )
+        assert User.objects.filter(
+            username__in=['admin-user-test-0-0', 'admin-user-test-0-1']
+        ).count() == 2
+        assert Title.objects.filter(name='Admin Title').count() == 2
@@ -0,0 +1,150 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+
+class MailServerDown(Exception):
+    pass
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def enqueue(self, count):
+        from api.v1.services import EmailOutboxService
+
+        with transaction.atomic():
+            return [
+                EmailOutboxService.enqueue(
+                    'Тема', f'Письмо {number}', f'user{number}@yamdb.fake'
+                )
+                for number in range(count)
+            ]
+
+    def make_due(self):
+        from users.models import OutgoingEmail
+
+        OutgoingEmail.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_01_signup_uses_outbox(self, client):
+        from users.models import OutgoingEmail
+
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        email = OutgoingEmail.objects.get()
+        assert (email.recipient, email.status) == (
+            'valid@yamdb.fake', OutgoingEmail.StatusChoices.SENT
+        ), (
+            'Проверьте, что письмо с кодом подтверждения записывается '
+            'в таблицу исходящих и отправляется после фиксации.'
+        )
+        assert email.body == '', (
+            'Проверьте, что текст с кодом подтверждения не хранится '
+            'после отправки.'
+        )
+
+    def test_02_rollback_discards_email(self):
+        from api.v1.services import EmailOutboxService
+        from users.models import OutgoingEmail
+
+        with pytest.raises(ZeroDivisionError):
+            with transaction.atomic():
+                EmailOutboxService.enqueue('Тема', 'Текст', 'a@yamdb.fake')
+                1 / 0
+        assert not OutgoingEmail.objects.exists() and not mail.outbox, (
+            'Проверьте, что письмо из отменённой транзакции не сохраняется '
+            'и не отправляется.'
+        )
+
+    def test_03_batch_connection_and_retry(self, monkeypatch):
+        import users.outbox
+        from users.models import OutgoingEmail
+
+        connections = []
+
+        def get_connection(*args, **kwargs):
+            connection = EmailBackend(*args, **kwargs)
+            connections.append(connection)
+            return connection
+
+        send_messages = EmailBackend.send_messages
+
+        def flaky_send_messages(backend, messages):
+            if messages[0].to == ['user1@yamdb.fake']:
+                raise MailServerDown('сервер недоступен')
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(users.outbox, 'get_connection', get_connection)
+        monkeypatch.setattr(EmailBackend, 'send_messages', flaky_send_messages)
+        emails = self.enqueue(3)
+
+        assert len(connections) == 1, (
+            'Проверьте, что пакет писем отправляется через одно соединение.'
+        )
+        assert len(mail.outbox) == 2
+        failed = OutgoingEmail.objects.get(pk=emails[1].pk)
+        assert failed.status == OutgoingEmail.StatusChoices.PENDING
+        assert failed.attempts == 1
+        assert failed.next_attempt > timezone.now()
+        assert 'MailServerDown' in failed.last_error, (
+            'Проверьте, что неудачная отправка откладывается с ошибкой.'
+        )
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        self.make_due()
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == 3
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.StatusChoices.SENT
+        ).exists(), 'Проверьте, что send_outbox повторяет отправку.'
+
+    def test_04_gives_up_after_max_attempts(self, monkeypatch, settings):
+        from users.models import OutgoingEmail
+        from users.outbox import deliver_outbox
+
+        def send_messages(backend, messages):
+            raise MailServerDown
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        email, = self.enqueue(1)
+        self.make_due()
+        deliver_outbox()
+        email.refresh_from_db()
+        assert (email.status, email.attempts, email.body) == (
+            OutgoingEmail.StatusChoices.FAILED, 2, ''
+        ), (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'больше не отправляется.'
+        )
+        self.make_due()
+        deliver_outbox()
+        email.refresh_from_db()
+        assert email.attempts == 2
+
+    def test_05_background_delivery(self, client, settings):
+        from api.v1.services import EmailOutboxService
+
+        settings.EMAIL_OUTBOX_EAGER = False
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        # Поток отправки один: пустая задача выполнится после отправки.
+        EmailOutboxService.executor.submit(lambda: None).result(timeout=10)
+        assert [message.to for message in mail.outbox] == [
+            ['valid@yamdb.fake']
+        ], 'Проверьте, что письмо отправляет фоновый поток.'
@@ -0,0 +1,195 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_GENRES = '/api/v1/genres/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        def set_rates(**rates):
+            settings.REST_FRAMEWORK = {
+                **settings.REST_FRAMEWORK,
+                'DEFAULT_THROTTLE_RATES': {
+                    **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                    **rates
+                }
+            }
+        return set_rates
+
+    def assert_throttled(self, client, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data=data)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что запрос к `{url}` сверх лимита отклоняется '
+            'со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert not context.captured_queries, (
+            f'Проверьте, что запрос к `{url}` сверх лимита отклоняется '
+            'без запросов к БД.'
+        )
+
+    def test_01_signup_ip(self, client, rates):
+        rates(signup_ip='2/hour')
+        for number in range(2):
+            response = client.post(self.URL_SIGNUP, data={
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}'
+            })
+            assert response.status_code == HTTPStatus.OK
+        self.assert_throttled(client, self.URL_SIGNUP, {
+            'email': 'user2@yamdb.fake', 'username': 'user2'
+        })
+        response = client.post(
+            self.URL_SIGNUP,
+            data={'email': 'user3@yamdb.fake', 'username': 'user3'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит регистраций считается для каждого IP.'
+        )
+
+    def test_02_signup_identifier(self, client, rates):
+        from django.core import mail
+
+        rates(signup_identifier='2/hour')
+        data = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+        for _ in range(2):
+            assert client.post(
+                self.URL_SIGNUP, data=data
+            ).status_code == HTTPStatus.OK
+        self.assert_throttled(client, self.URL_SIGNUP, {
+            'email': 'VALID@yamdb.fake', 'username': 'another_username'
+        })
+        assert len(mail.outbox) == 2, (
+            'Проверьте, что письмо не отправляется на email сверх лимита.'
+        )
+
+    def test_03_token_identifier(self, client, user, rates):
+        rates(token_identifier='2/hour')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert client.post(
+                self.URL_TOKEN, data=data
+            ).status_code == HTTPStatus.BAD_REQUEST
+        self.assert_throttled(client, self.URL_TOKEN, data)
+
+    def test_04_user_writes(self, admin_client, user_superuser_client, rates):
+        rates(writes='2/minute')
+        for number in range(2):
+            response = admin_client.post(self.URL_GENRES, data={
+                'name': f'Жанр {number}', 'slug': f'genre-{number}'
+            })
+            assert response.status_code == HTTPStatus.CREATED
+        self.assert_throttled(admin_client, self.URL_GENRES, {
+            'name': 'Жанр 2', 'slug': 'genre-2'
+        })
+        assert admin_client.get(
+            self.URL_GENRES
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение не ограничивается лимитом записи.'
+        )
+        response = user_superuser_client.post(self.URL_GENRES, data={
+            'name': 'Жанр 3', 'slug': 'genre-3'
+        })
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что лимит записи считается для каждого пользователя.'
+        )
+
+    def test_05_window_slides(self, client, rates, monkeypatch):
+        from api.v1.throttling import SlidingWindowThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(
+            SlidingWindowThrottle, 'timer', staticmethod(lambda: now[0])
+        )
+        rates(token_ip='2/minute')
+        data = {'username': 'nobody', 'confirmation_code': 'wrong'}
+        statuses = [
+            client.post(self.URL_TOKEN, data=data).status_code
+            for _ in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS
+        now[0] += 60
+        assert client.post(
+            self.URL_TOKEN, data=data
+        ).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что лимит освобождается по мере сдвига окна.'
+        )
+        assert client.post(
+            self.URL_TOKEN, data=data
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запросы предыдущего окна учитываются '
+            'пропорционально.'
+        )
+
+    def test_06_concurrent_requests(self, rates, monkeypatch):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from django.core.cache import cache
+        from django.test import RequestFactory
+        from rest_framework.views import APIView
+
+        from api.v1 import throttling
+
+        workers = 8
+        barrier = threading.Barrier(workers)
+
+        class RacingCache:
+            """Все потоки читают кэш прежде, чем кто-то из них запишет."""
+
+            def __getattr__(self, name):
+                return getattr(cache, name)
+
+            def get_many(self, keys):
+                result = cache.get_many(keys)
+                barrier.wait(timeout=5)
+                return result
+
+        monkeypatch.setattr(throttling, 'cache', RacingCache())
+        rates(token_ip='5/hour')
+        view = APIView()
+        view.throttle_scope = 'token'
+        request = view.initialize_request(
+            RequestFactory().post(self.URL_TOKEN)
+        )
+
+        def allowed(_):
+            return throttling.IPThrottle().allow_request(request, view)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(allowed, range(workers)))
+        assert results.count(True) == 5, (
+            'Проверьте, что параллельные запросы не превышают лимит.'
+        )
+
+    def test_07_forwarded_for_ignored(self, client, rates):
+        rates(signup_ip='2/hour')
+        for number in range(2):
+            response = client.post(
+                self.URL_SIGNUP,
+                data={
+                    'email': f'user{number}@yamdb.fake',
+                    'username': f'user{number}'
+                },
+                HTTP_X_FORWARDED_FOR=f'10.0.1.{number}'
+            )
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(
+            self.URL_SIGNUP,
+            data={'email': 'user2@yamdb.fake', 'username': 'user2'},
+            HTTP_X_FORWARDED_FOR='10.0.1.2'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит по IP нельзя обойти, подставив '
+            'заголовок X-Forwarded-For.'
+        )
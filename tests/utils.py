@@ -1,5 +1,9 @@
+from contextlib import contextmanager
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 
 check_name_and_slug_patterns = (
     (
@@ -305,3 +309,15 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+@contextmanager
+def check_query_budget(budget, description):
+    """Проверяет, что код в блоке выполняет не больше budget запросов."""
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    queries = '\n'.join(query['sql'] for query in context.captured_queries)
+    assert len(context) <= budget, (
+        f'Проверьте, что {description} выполняет не больше {budget} '
+        f'запросов к БД, а не {len(context)}:\n{queries}'
+    )